@@ -0,0 +1,140 @@
+import hashlib
+import re
+
+import numpy as np
+
+from core.config import config
+from core.logger import get_logger
+from core.utils import get_db, now_iso
+from sources.base_source import RawPost
+
+log = get_logger(__name__)
+
+URL_RE = re.compile(r"https?://\S+|www\.\S+")
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def tokenize(title: str, body: str) -> list[str]:
+    text = URL_RE.sub(" ", f"{title}\n{body or ''}".lower())
+    return TOKEN_RE.findall(text)
+
+
+def shingles(tokens: list[str]) -> set[str]:
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def simhash(features: set[str]) -> int:
+    if not features:
+        return 0
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
+
+
+def to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+def band_buckets(value: int) -> list[int]:
+    return [(band << BAND_BITS) | ((value >> (band * BAND_BITS)) & BAND_MASK) for band in range(BANDS)]
+
+
+class DuplicateDetector:
+    def __init__(self, max_distance: int | None = None, min_tokens: int | None = None) -> None:
+        self._max_distance = config.DEDUP_MAX_HAMMING if max_distance is None else max_distance
+        self._min_tokens = config.DEDUP_MIN_TOKENS if min_tokens is None else min_tokens
+        if self._max_distance >= BANDS:
+            raise ValueError(f"DEDUP_MAX_HAMMING must be below {BANDS} for the LSH bands to be exact")
+
+    def check_and_index(self, post: RawPost) -> str | None:
+        tokens = tokenize(post.title, post.body)
+        features = shingles(tokens)
+        if not features:
+            log.debug("Post %s has no tokens to fingerprint, skipping dedup", post.id)
+            return None
+        value = simhash(features)
+        max_distance = self._max_distance if len(tokens) >= self._min_tokens else 0
+        buckets = band_buckets(value)
+
+        with get_db() as conn:
+            placeholders = ",".join("?" for _ in buckets)
+            rows = conn.execute(
+                f"SELECT post_id, simhash FROM simhash_lsh WHERE bucket IN ({placeholders})",
+                buckets,
+            ).fetchall()
+
+            canonical_id = None
+            best = max_distance + 1
+            for row in rows:
+                if row["post_id"] == post.id:
+                    continue
+                distance = (to_unsigned(row["simhash"]) ^ value).bit_count()
+                if distance < best or (distance == best and canonical_id and row["post_id"] < canonical_id):
+                    best = distance
+                    canonical_id = row["post_id"]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO post_fingerprints (post_id, simhash, canonical_id) VALUES (?, ?, ?)",
+                (post.id, to_signed(value), canonical_id),
+            )
+            if canonical_id is None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO simhash_lsh (bucket, post_id, simhash) VALUES (?, ?, ?)",
+                    [(bucket, post.id, to_signed(value)) for bucket in buckets],
+                )
+
+        if canonical_id:
+            log.debug("Post %s is a near-duplicate of %s (distance %d)", post.id, canonical_id, best)
+        return canonical_id
+
+
+def release_canonical(post_id: str) -> str | None:
+    with get_db() as conn:
+        row = conn.execute("SELECT simhash FROM post_fingerprints WHERE post_id = ?", (post_id,)).fetchone()
+        if row is None:
+            return None
+        buckets = band_buckets(to_unsigned(row["simhash"]))
+        placeholders = ",".join("?" for _ in buckets)
+        conn.execute(
+            f"DELETE FROM simhash_lsh WHERE bucket IN ({placeholders}) AND post_id = ?",
+            [*buckets, post_id],
+        )
+
+        promoted = conn.execute(
+            "SELECT post_id, simhash FROM post_fingerprints WHERE canonical_id = ? ORDER BY post_id LIMIT 1",
+            (post_id,),
+        ).fetchone()
+        if promoted is None:
+            return None
+        promoted_id = promoted["post_id"]
+        conn.execute("UPDATE post_fingerprints SET canonical_id = NULL WHERE post_id = ?", (promoted_id,))
+        conn.execute(
+            "UPDATE post_fingerprints SET canonical_id = ? WHERE canonical_id = ? OR post_id = ?",
+            (promoted_id, post_id, post_id),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO simhash_lsh (bucket, post_id, simhash) VALUES (?, ?, ?)",
+            [(bucket, promoted_id, promoted["simhash"]) for bucket in band_buckets(to_unsigned(promoted["simhash"]))],
+        )
+        conn.execute(
+            """
+            UPDATE post_state
+            SET stage = 'fetched', attempts = 0, last_error = NULL, next_attempt_at = NULL, updated_at = ?
+            WHERE post_id = ? AND stage = 'duplicate'
+            """,
+            (now_iso(), promoted_id),
+        )
+
+    log.info("Promoted %s to canonical in place of %s", promoted_id, post_id)
+    return promoted_id
@@ -1,11 +1,15 @@
 import json
+import threading
 import time
+from contextlib import nullcontext
+from dataclasses import MISSING, dataclass, fields
 from typing import Any
 
-from openai import OpenAI, APIError, APITimeoutError, RateLimitError
-
+from analysis.prompt_prep import estimate_tokens
 from core.config import config
 from core.logger import get_logger
+from core.metrics import metrics
+from core.ratelimit import get_limiter, response_headers, shared_cap
 
 log = get_logger(__name__)
 
@@ -38,46 +42,197 @@ REQUIRED_FIELDS = {
 
 VALID_MARKET_TYPES = {"B2B", "Consumer", "Tech", "Hybrid"}
 
+MAX_COMPLETION_TOKENS = 500
+
+
+@dataclass
+class ModelTier:
+    name: str
+    model: str
+    base_url: str | None = None
+    api_key: str | None = None
+    timeout: float = config.OPENAI_TIMEOUT
+    max_tokens: int = MAX_COMPLETION_TOKENS
+    max_attempts: int = config.OPENAI_MAX_RETRIES
+    concurrency: int = 0
+    rpm: float = 0
+    tpm: float = 0
+    input_cost: float = 0.0
+    output_cost: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ModelTier":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown LLM tier settings: {', '.join(sorted(unknown))}")
+        required = {f.name for f in fields(cls) if f.default is MISSING and f.default_factory is MISSING}
+        missing = required - set(data)
+        if missing:
+            raise ValueError(f"Missing LLM tier settings: {', '.join(sorted(missing))}")
+        name = data.get("name")
+        if not isinstance(name, str) or not name or "." in name:
+            raise ValueError(f"LLM tier name must be a non-empty string without '.': {name!r}")
+        return cls(**data)
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input_cost + completion_tokens * self.output_cost) / 1_000_000
+
+
+def parse_tiers(raw: str) -> list[ModelTier]:
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"LLM_TIERS is not valid JSON: {exc}") from exc
+    if not isinstance(data, list) or not data or not all(isinstance(tier, dict) for tier in data):
+        raise ValueError("LLM_TIERS must be a non-empty JSON list of tier objects")
+    return [ModelTier.from_dict(tier) for tier in data]
+
+
+def load_tiers() -> list[ModelTier]:
+    if config.LLM_TIERS.strip():
+        return parse_tiers(config.LLM_TIERS)
+    return [ModelTier(
+        name="default",
+        model=config.OPENAI_MODEL,
+        base_url=config.OPENAI_BASE_URL,
+        input_cost=config.OPENAI_INPUT_COST_PER_MTOK,
+        output_cost=config.OPENAI_OUTPUT_COST_PER_MTOK,
+    )]
+
+
+def is_borderline(result: dict[str, Any]) -> bool:
+    no_problem = result["problem_summary"] == "No clear problem identified"
+    scores = (result["pain_score"], result["monetization_score"])
+    if no_problem:
+        return any(scores)
+    return config.LLM_BORDERLINE_MIN <= sum(scores) / len(scores) <= config.LLM_BORDERLINE_MAX
+
 
 class LLMService:
-    def __init__(self) -> None:
-        self._client = OpenAI(
-            api_key=config.OPENAI_API_KEY,
-            timeout=config.OPENAI_TIMEOUT,
-        )
+    def __init__(self, tiers: list[ModelTier] | None = None) -> None:
+        from openai import OpenAI
+
+        self._tiers = tiers or load_tiers()
+        self._clients = {}
+        self._limiters = {}
+        self._slots = {}
+        for tier in self._tiers:
+            self._clients[tier.name] = OpenAI(
+                api_key=tier.api_key or config.OPENAI_API_KEY,
+                base_url=tier.base_url or config.OPENAI_BASE_URL,
+                timeout=tier.timeout,
+                max_retries=0,
+            )
+            self._limiters[tier.name] = (
+                get_limiter(f"openai.{tier.name}", tier.rpm, tier.tpm)
+                if tier.rpm or tier.tpm else get_limiter("openai")
+            )
+            concurrency = shared_cap(tier.concurrency)
+            self._slots[tier.name] = threading.BoundedSemaphore(concurrency) if concurrency else None
+        log.debug("LLM cascade: %s", " -> ".join(f"{t.name}({t.model})" for t in self._tiers))
 
     def extract_problem(self, title: str, body: str) -> dict[str, Any] | None:
         user_content = f"Title: {title}\n\nBody: {body[:3000]}" if body else f"Title: {title}"
 
-        for attempt in range(1, config.OPENAI_MAX_RETRIES + 1):
+        fallback = None
+        for index, tier in enumerate(self._tiers):
+            final = index == len(self._tiers) - 1
+            parsed = self._call_tier(tier, user_content, retry=final)
+            if parsed is not None and (final or not is_borderline(parsed)):
+                metrics.incr(f"llm.tier.{tier.name}.accepted")
+                return parsed
+            if final:
+                break
+            reason = "invalid" if parsed is None else "borderline"
+            fallback = parsed or fallback
+            metrics.incr("llm.escalations")
+            metrics.incr(f"llm.tier.{tier.name}.escalations")
+            metrics.incr(f"llm.tier.{tier.name}.escalations.{reason}")
+            log.debug("Escalating from %s (%s)", tier.name, reason)
+
+        if fallback is not None:
+            metrics.incr("llm.fallbacks")
+            return fallback
+        metrics.incr("llm.failures")
+        log.error("LLM extraction failed on every tier")
+        return None
+
+    def _call_tier(self, tier: ModelTier, user_content: str, retry: bool) -> dict[str, Any] | None:
+        from openai import APIError, APITimeoutError, RateLimitError
+
+        client = self._clients[tier.name]
+        limiter = self._limiters[tier.name]
+        slot = self._slots[tier.name]
+        prefix = f"llm.tier.{tier.name}"
+        estimated = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(user_content) + tier.max_tokens
+
+        for attempt in range(1, tier.max_attempts + 1):
+            if attempt > 1:
+                metrics.incr("llm.retries")
             try:
-                response = self._client.chat.completions.create(
-                    model=config.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_content},
-                    ],
-                    temperature=0.2,
-                    max_tokens=500,
-                )
-                raw = response.choices[0].message.content.strip()
+                limiter.acquire(estimated)
+                metrics.incr("llm.requests")
+                metrics.incr(f"{prefix}.requests")
+                with slot or nullcontext(), metrics.timer("llm.request"), metrics.timer(f"{prefix}.request"):
+                    raw_response = client.chat.completions.with_raw_response.create(
+                        model=tier.model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": user_content},
+                        ],
+                        temperature=0.2,
+                        max_tokens=tier.max_tokens,
+                    )
+                limiter.update(raw_response.headers)
+                response = raw_response.parse()
+                if response.usage:
+                    usage = response.usage
+                    cost = tier.cost(usage.prompt_tokens, usage.completion_tokens)
+                    metrics.incr("llm.prompt_tokens", usage.prompt_tokens)
+                    metrics.incr("llm.completion_tokens", usage.completion_tokens)
+                    metrics.incr("llm.cost_usd", cost)
+                    metrics.incr(f"{prefix}.prompt_tokens", usage.prompt_tokens)
+                    metrics.incr(f"{prefix}.completion_tokens", usage.completion_tokens)
+                    metrics.incr(f"{prefix}.cost_usd", cost)
+                    limiter.settle(estimated, usage.total_tokens)
+                raw = (response.choices[0].message.content or "").strip()
                 parsed = self._parse_json(raw)
                 if parsed:
                     return parsed
-                log.warning("LLM returned invalid JSON on attempt %d", attempt)
-            except (APITimeoutError, RateLimitError) as exc:
+                metrics.incr("llm.invalid_json")
+                metrics.incr(f"{prefix}.invalid_json")
+                log.warning("LLM %s returned invalid JSON on attempt %d", tier.name, attempt)
+                if not retry:
+                    return None
+            except RateLimitError as exc:
+                metrics.incr("llm.rate_limited")
+                headers, _ = response_headers(exc)
+                limiter.update(headers, 429)
+                log.warning("LLM %s rate limited on attempt %d", tier.name, attempt)
+            except APITimeoutError as exc:
+                metrics.incr("llm.timeouts")
+                metrics.incr(f"{prefix}.timeouts")
+                if not retry:
+                    log.warning("LLM %s %s on attempt %d", tier.name, type(exc).__name__, attempt)
+                    return None
                 wait = min(2 ** attempt, 60)
-                log.warning("LLM %s on attempt %d, retrying in %ds", type(exc).__name__, attempt, wait)
+                log.warning("LLM %s %s on attempt %d, retrying in %ds", tier.name, type(exc).__name__, attempt, wait)
                 time.sleep(wait)
             except APIError as exc:
-                log.error("LLM API error on attempt %d: %s", attempt, exc)
+                metrics.incr("llm.api_errors")
+                metrics.incr(f"{prefix}.api_errors")
+                log.error("LLM %s API error on attempt %d: %s", tier.name, attempt, exc)
+                if not retry:
+                    return None
                 wait = min(2 ** attempt, 60)
                 time.sleep(wait)
             except Exception as exc:
-                log.error("Unexpected LLM error: %s", exc)
+                metrics.incr(f"{prefix}.failures")
+                log.error("Unexpected LLM %s error: %s", tier.name, exc)
                 return None
 
-        log.error("LLM extraction failed after %d attempts", config.OPENAI_MAX_RETRIES)
+        log.error("LLM %s failed after %d attempts", tier.name, tier.max_attempts)
         return None
 
     @staticmethod
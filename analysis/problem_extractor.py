@@ -1,31 +1,53 @@
 from typing import Any
 
 from analysis.llm_service import LLMService
+from analysis.prompt_prep import prepare_prompt
+from core.config import config
 from core.logger import get_logger
+from core.metrics import metrics
 from core.utils import get_db, now_iso
 from sources.base_source import RawPost
 
 log = get_logger(__name__)
 
 
+class ExtractionError(Exception):
+    pass
+
+
 class ProblemExtractor:
     def __init__(self, llm: LLMService) -> None:
         self._llm = llm
 
     def extract_and_store(self, post: RawPost) -> int | None:
-        result = self._llm.extract_problem(post.title, post.body)
+        result = self.extract(post)
         if not result:
-            log.warning("No LLM result for post %s", post.id)
             return None
+        return self.store(post.id, result)
+
+    def extract(self, post: RawPost) -> dict[str, Any] | None:
+        title, body = post.title, post.body
+        if config.PROMPT_PREP_ENABLED:
+            with metrics.timer("stage.prompt_prep"):
+                prompt = prepare_prompt(post.title, post.body)
+            metrics.incr("prompt.body_tokens_raw", prompt.original_tokens)
+            metrics.incr("prompt.body_tokens", prompt.tokens)
+            metrics.incr("prompt.sentences_dropped", prompt.sentences_total - prompt.sentences_kept)
+            title, body = prompt.title, prompt.body
+
+        result = self._llm.extract_problem(title, body)
+        if not result:
+            log.warning("No LLM result for post %s", post.id)
+            raise ExtractionError(f"No LLM result for post {post.id}")
 
         if result.get("problem_summary") == "No clear problem identified":
             log.debug("No problem in post %s", post.id)
             return None
 
-        return self._store_problem(post.id, result)
+        return result
 
     @staticmethod
-    def _store_problem(post_id: str, data: dict[str, Any]) -> int | None:
+    def store(post_id: str, data: dict[str, Any]) -> int | None:
         with get_db() as conn:
             cursor = conn.execute(
                 """
@@ -0,0 +1,173 @@
+import html
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+from core.config import config
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+CODE_BLOCK_RE = re.compile(r"```.*?```|~~~.*?~~~", re.DOTALL)
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+URL_RE = re.compile(r"https?://\S+|www\.\S+")
+HTML_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s*", re.MULTILINE)
+QUOTE_RE = re.compile(r"^\s*>+\s?", re.MULTILINE)
+BULLET_RE = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+", re.MULTILINE)
+RULE_RE = re.compile(r"^\s*(?:[-*_]\s*){3,}$", re.MULTILINE)
+EMPHASIS_RE = re.compile(r"(?<!\w)(\*\*|__|\*|_|~~|`)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+TABLE_PIPE_RE = re.compile(r"\s*\|\s*")
+SPACE_RE = re.compile(r"[ \t ]+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n+")
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+SIGNATURE_RE = re.compile(r"^\s*(?:--\s*|sent from my \w+|posted from|thanks? in advance|cheers,?|best,?|regards,?)\s*$", re.I)
+BOILERPLATE_RE = re.compile(
+    r"^\s*(?:edit\s*\d*\s*:|update\s*\d*\s*:|disclaimer\s*:|throwaway|sorry for (?:the )?(?:formatting|english|long post)|"
+    r"(?:i'?m )?on mobile|not sure if this is the right (?:sub|place)|mods,? (?:please )?(?:remove|delete)|"
+    r"thanks?(?: you)?(?: all| everyone| guys| so much)?[.!]*$|any (?:help|advice|feedback) (?:is |would be )?"
+    r"(?:much |greatly )?appreciated[.!]*$|tia[.!]*$)",
+    re.I,
+)
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how i if
+in into is it its itself just me more most my myself no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your yours yourself im ive dont
+""".split())
+CUE_WORDS = frozenset("""
+problem problems pain painful struggle struggling frustrated frustrating annoying hard difficult expensive slow manual
+waste wasting hours tedious broken hate wish need needs looking alternative solution tool pay paying cost costs
+churn customers clients revenue scale scaling automate
+""".split())
+
+TITLE_WEIGHT = 2.0
+CUE_WEIGHT = 1.0
+QUESTION_BONUS = 0.5
+LEAD_BONUS = 0.75
+SIGN_OFF_MAX_WORDS = 4
+
+
+@dataclass
+class PreparedPrompt:
+    title: str
+    body: str
+    tokens: int
+    original_tokens: int
+    sentences_kept: int
+    sentences_total: int
+
+
+@lru_cache(maxsize=1)
+def _token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: math.ceil(len(text) / 4)
+    try:
+        encoding = tiktoken.encoding_for_model(config.OPENAI_MODEL)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_tokens(text: str) -> int:
+    return _token_counter()(text) if text else 0
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", html.unescape(text or ""))
+    text = CODE_BLOCK_RE.sub(" ", text)
+    text = IMAGE_RE.sub(" ", text)
+    text = LINK_RE.sub(r"\1", text)
+    text = URL_RE.sub(" ", text)
+    text = HTML_TAG_RE.sub(" ", text)
+    text = RULE_RE.sub("", text)
+    text = HEADING_RE.sub("", text)
+    text = QUOTE_RE.sub("", text)
+    text = BULLET_RE.sub("", text)
+    text = EMPHASIS_RE.sub(r"\2", text)
+    text = TABLE_PIPE_RE.sub(" ", text) if "|" in text else text
+    lines = [SPACE_RE.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def _is_sign_off(lines: list[str]) -> bool:
+    return all(len(line.split()) <= SIGN_OFF_MAX_WORDS for line in lines)
+
+
+def strip_boilerplate(text: str) -> str:
+    lines = text.splitlines()
+    kept: list[str] = []
+    for index, line in enumerate(lines):
+        if SIGNATURE_RE.match(line):
+            if _is_sign_off(lines[index + 1:]):
+                break
+            continue
+        if BOILERPLATE_RE.match(line):
+            continue
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in SENTENCE_RE.split(text) if s and len(WORD_RE.findall(s.lower())) >= 2]
+
+
+def _terms(text: str) -> set[str]:
+    return {w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2}
+
+
+def salience(sentence: str, position: int, title_terms: set[str]) -> float:
+    terms = _terms(sentence)
+    if not terms:
+        return 0.0
+    norm = math.sqrt(len(terms))
+    score = TITLE_WEIGHT * len(terms & title_terms) / norm
+    score += CUE_WEIGHT * len(terms & CUE_WORDS) / norm
+    if sentence.endswith("?"):
+        score += QUESTION_BONUS
+    if position < 2:
+        score += LEAD_BONUS
+    return score
+
+
+def prepare_prompt(title: str, body: str, budget: int | None = None) -> PreparedPrompt:
+    budget = config.PROMPT_TOKEN_BUDGET if budget is None else budget
+    title = normalize(title).replace("\n", " ")
+    original_tokens = estimate_tokens(body or "")
+    cleaned = strip_boilerplate(normalize(body))
+    cleaned_tokens = estimate_tokens(cleaned)
+    if cleaned_tokens <= budget:
+        count = len(split_sentences(cleaned))
+        return PreparedPrompt(title, cleaned, cleaned_tokens, original_tokens, count, count)
+
+    sentences = split_sentences(cleaned)
+    if not sentences:
+        return PreparedPrompt(title, "", 0, original_tokens, 0, 0)
+
+    costs = [estimate_tokens(s) + 1 for s in sentences]
+    if sum(costs) <= budget:
+        text = " ".join(sentences)
+        return PreparedPrompt(title, text, estimate_tokens(text), original_tokens, len(sentences), len(sentences))
+
+    title_terms = _terms(title)
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: (-salience(sentences[i], i, title_terms), i),
+    )
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        if used + costs[i] <= budget:
+            chosen.append(i)
+            used += costs[i]
+    text = " ".join(sentences[i] for i in sorted(chosen))
+    return PreparedPrompt(title, text, estimate_tokens(text), original_tokens, len(chosen), len(sentences))
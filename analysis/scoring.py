@@ -17,7 +17,11 @@ class ScoringService:
                 return 0.0
 
             post = conn.execute(
-                "SELECT * FROM raw_posts WHERE id = ?", (problem["post_id"],)
+                """
+                SELECT SUM(upvotes) AS upvotes, SUM(comments) AS comments FROM raw_posts
+                WHERE id = ?1 OR id IN (SELECT post_id FROM post_fingerprints WHERE canonical_id = ?1)
+                """,
+                (problem["post_id"],),
             ).fetchone()
 
             cluster_row = conn.execute(
@@ -36,8 +40,8 @@ class ScoringService:
                     cluster_size = c["size"]
 
             engagement = self._engagement_score(
-                post["upvotes"] if post else 0,
-                post["comments"] if post else 0,
+                post["upvotes"] or 0,
+                post["comments"] or 0,
             )
             pain = self._pain_score(problem["pain_score"])
             monetization = self._monetization_score(problem["monetization_score"])
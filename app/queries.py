@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+SORT_KEYS = {
+    "score": ("final_score", "id"),
+    "momentum": ("momentum_score", "final_score", "id"),
+}
+
+
+@dataclass
+class DashboardFilters:
+    markets: list[str] = field(default_factory=list)
+    min_score: float = 0
+    sources: list[str] = field(default_factory=list)
+    subreddits: list[str] = field(default_factory=list)
+
+
+def build_query(
+    filters: DashboardFilters,
+    time_filter: str | None = None,
+    sort: str = "score",
+    after: tuple | None = None,
+    limit: int = 50,
+) -> tuple[str, list]:
+    columns = SORT_KEYS[sort]
+    params: list = []
+    conditions = ["1=1"]
+
+    if filters.markets:
+        placeholders = ",".join("?" for _ in filters.markets)
+        conditions.append(f"p.market_type IN ({placeholders})")
+        params.extend(filters.markets)
+
+    conditions.append("p.final_score >= ?")
+    params.append(filters.min_score)
+
+    if filters.sources:
+        placeholders = ",".join("?" for _ in filters.sources)
+        conditions.append(f"p.source IN ({placeholders})")
+        params.extend(filters.sources)
+
+    if filters.subreddits:
+        placeholders = ",".join("?" for _ in filters.subreddits)
+        conditions.append(f"(p.subreddit IN ({placeholders}) OR p.subreddit IS NULL)")
+        params.extend(filters.subreddits)
+
+    if time_filter:
+        conditions.append("p.created_at >= ?")
+        params.append(time_filter)
+
+    if after is not None:
+        keys = ", ".join(f"p.{column}" for column in columns)
+        conditions.append(f"({keys}) < ({', '.join('?' for _ in columns)})")
+        params.extend(after)
+
+    where = " AND ".join(conditions)
+    order = ", ".join(f"p.{column} DESC" for column in columns)
+
+    query = f"""
+        SELECT p.*
+        FROM dashboard_problems p
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT ?
+    """
+    params.append(limit)
+    return query, params
+
+
+def page_cursor(row: Any, sort: str = "score") -> tuple:
+    return tuple(row[column] for column in SORT_KEYS[sort])
@@ -0,0 +1,71 @@
+from html import escape
+from typing import Any
+
+CARD_TEMPLATE = """<div style="border: 1px solid #333; border-radius: 10px; padding: 16px; margin-bottom: 12px; background: #1a1a2e;">
+<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
+<span style="font-size: 1.1em; font-weight: 600; color: #e0e0e0;">{summary}</span>
+<span style="background: {color}; color: #000; padding: 4px 12px; border-radius: 20px; font-weight: 700; font-size: 1.1em;">{score:.0f}</span>
+</div>
+<div style="color: #999; font-size: 0.85em; margin-bottom: 8px;">
+🎯 {target_group} &nbsp;|&nbsp; 🏪 {market_type} &nbsp;|&nbsp; 💰 {buyer_type}
+</div>
+<div style="display: flex; gap: 16px; color: #bbb; font-size: 0.82em; margin-bottom: 8px;">
+<span>🔥 Pain: {pain:.0f}</span>
+<span>💵 Monet: {monetization:.0f}</span>
+<span>📊 Engage: {engagement:.1f}</span>
+<span>🔄 Freq: {frequency:.1f}</span>
+<span>🚀 Momentum: {momentum:.1f}</span>
+<span>👥 Cluster: {cluster_size}</span>
+</div>
+<div style="display: flex; justify-content: space-between; color: #777; font-size: 0.8em;">
+<span>📝 {post_title}</span>
+<span>{source_label} · <a href="{source_url}" target="_blank" style="color: #6699cc;">View Source ↗</a></span>
+</div>
+</div>"""
+
+
+def get_source_url(post_id: str) -> str:
+    if post_id.startswith("reddit_"):
+        reddit_id = post_id.replace("reddit_", "")
+        return f"https://reddit.com/comments/{reddit_id}"
+    elif post_id.startswith("askhn_"):
+        hn_id = post_id.replace("askhn_", "")
+        return f"https://news.ycombinator.com/item?id={hn_id}"
+    return "#"
+
+
+def score_color(score: float) -> str:
+    if score >= 70:
+        return "#22c55e"
+    elif score >= 40:
+        return "#eab308"
+    return "#ef4444"
+
+
+def render_card(row: Any) -> str:
+    score = row["final_score"] or 0
+    source_label = row["source"].upper()
+    if row["subreddit"]:
+        source_label += f" / r/{row['subreddit']}"
+
+    return CARD_TEMPLATE.format(
+        summary=escape(row["problem_summary"]),
+        color=score_color(score),
+        score=score,
+        target_group=escape(row["target_group"] or "N/A"),
+        market_type=escape(row["market_type"] or "N/A"),
+        buyer_type=escape(row["buyer_type"] or "N/A"),
+        pain=row["pain_score"] or 0,
+        monetization=row["monetization_score"] or 0,
+        engagement=row["engagement_score"] or 0,
+        frequency=row["frequency_score"] or 0,
+        momentum=row["momentum_score"] or 0,
+        cluster_size=row["cluster_size"],
+        post_title=escape(row["post_title"][:80]),
+        source_label=escape(source_label),
+        source_url=escape(get_source_url(row["post_id"]), quote=True),
+    )
+
+
+def render_page(rows: list[Any]) -> str:
+    return "\n".join(render_card(row) for row in rows)
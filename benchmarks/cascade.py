@@ -0,0 +1,133 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.llm_service import LLMService, ModelTier
+from benchmarks.corpus import generate_posts
+from benchmarks.stub_server import StubServer, default_chat_handler
+from core.config import config
+from core.metrics import metrics
+
+FAST_MODEL = "stub-fast"
+STRONG_MODEL = "stub-strong"
+
+
+def cascade_handler(invalid_rate: float, borderline_rate: float):
+    def handler(model: str, messages: list[dict[str, str]]) -> str:
+        content = default_chat_handler(model, messages)
+        if model != FAST_MODEL:
+            return content
+        roll = (zlib.crc32(messages[-1]["content"].encode("utf-8")) % 1000) / 1000
+        if roll < invalid_rate:
+            return content[: len(content) // 2]
+        data = json.loads(content)
+        if roll < invalid_rate + borderline_rate:
+            data.update(problem_summary="Some problem", pain_score=5, monetization_score=5)
+        elif data["problem_summary"] == "No clear problem identified":
+            data.update(pain_score=0, monetization_score=0, complexity_score=0)
+        else:
+            data.update(pain_score=max(7, data["pain_score"]), monetization_score=max(7, data["monetization_score"]))
+        return json.dumps(data)
+
+    return handler
+
+
+def run(tiers: list[ModelTier], posts: list, threads: int) -> dict:
+    metrics.reset()
+    llm = LLMService(tiers)
+    results: list[dict | None] = []
+    lock = threading.Lock()
+    queue = iter(posts)
+
+    def worker() -> None:
+        while True:
+            with lock:
+                post = next(queue, None)
+            if post is None:
+                return
+            result = llm.extract_problem(post.title, post.body)
+            with lock:
+                results.append(result)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    summary = metrics.summary()
+    counters, histograms = summary["counters"], summary["histograms"]
+    report = {
+        "posts": len(posts),
+        "valid_results": sum(r is not None for r in results),
+        "elapsed_seconds": round(elapsed, 3),
+        "cost_usd": round(counters.get("llm.cost_usd", 0.0), 6),
+        "escalations": counters.get("llm.escalations", 0),
+        "tiers": {},
+    }
+    for tier in tiers:
+        prefix = f"llm.tier.{tier.name}"
+        accepted = counters.get(f"{prefix}.accepted", 0)
+        escalated = counters.get(f"{prefix}.escalations", 0)
+        latency = histograms.get(f"{prefix}.request", {})
+        report["tiers"][tier.name] = {
+            "requests": counters.get(f"{prefix}.requests", 0),
+            "accepted": accepted,
+            "escalated": escalated,
+            "escalation_rate": round(escalated / (accepted + escalated), 3) if accepted + escalated else 0.0,
+            "p50_seconds": latency.get("p50", 0.0),
+            "p95_seconds": latency.get("p95", 0.0),
+            "cost_usd": round(counters.get(f"{prefix}.cost_usd", 0.0), 6),
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exercise the LLM model cascade against local stub endpoints")
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--invalid-rate", type=float, default=0.05)
+    parser.add_argument("--borderline-rate", type=float, default=0.15)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    stub = StubServer(
+        rate=1000, burst=100,
+        chat_handler=cascade_handler(args.invalid_rate, args.borderline_rate),
+        model_latency={FAST_MODEL: 0.02, STRONG_MODEL: 0.1},
+    )
+    config.OPENAI_API_KEY = config.OPENAI_API_KEY or "stub"
+    base_url = f"{stub.url}/v1"
+    fast = ModelTier("fast", FAST_MODEL, base_url=base_url, max_tokens=300, timeout=5, max_attempts=1,
+                     concurrency=4, rpm=60_000, input_cost=0.10, output_cost=0.40)
+    strong = ModelTier("strong", STRONG_MODEL, base_url=base_url, timeout=30,
+                       concurrency=2, rpm=60_000, input_cost=0.40, output_cost=1.60)
+    posts = list(generate_posts(args.posts, seed=11))
+
+    try:
+        report = {
+            "strong_only": run([strong], posts, args.threads),
+            "cascade": run([fast, strong], posts, args.threads),
+            "max_in_flight": dict(stub.max_in_flight),
+        }
+    finally:
+        stub.close()
+
+    print(json.dumps(report, indent=2))
+    ok = all(r["valid_results"] == args.posts for r in (report["strong_only"], report["cascade"]))
+    ok = ok and report["max_in_flight"].get(FAST_MODEL, 0) <= fast.concurrency
+    ok = ok and report["max_in_flight"].get(STRONG_MODEL, 0) <= strong.concurrency
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
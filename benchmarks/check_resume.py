@@ -0,0 +1,90 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_posts
+from benchmarks.fakes import FakeEmbeddingService, FakeLLMService, FakeSource
+from benchmarks.run import temporary_db
+from core.config import config
+from core.utils import get_db
+from pipeline.run_pipeline import run_pipeline
+
+FAIL_TRIGGER_SQL = """
+    CREATE TRIGGER fail_cluster_link BEFORE INSERT ON problem_clusters
+    WHEN NEW.problem_id % {every} = 0
+    BEGIN
+        SELECT RAISE(ABORT, 'injected cluster write failure');
+    END
+"""
+
+CHECKS = {
+    "marked past a failed cluster write": """
+        SELECT COUNT(*) FROM post_state ps
+        LEFT JOIN problem_clusters pc ON pc.problem_id = ps.problem_id
+        WHERE ps.stage IN ('clustered', 'scored') AND pc.problem_id IS NULL
+    """,
+    "failed posts without a retry scheduled": """
+        SELECT COUNT(*) FROM post_state ps
+        JOIN problems p ON p.post_id = ps.post_id
+        WHERE p.id % :every = 0 AND ps.stage NOT IN ('scored', 'failed')
+          AND (ps.attempts = 0 OR ps.next_attempt_at IS NULL)
+    """,
+    "clusters with a size that does not match their members": """
+        SELECT COUNT(*) FROM clusters cl
+        WHERE cl.size != (SELECT COUNT(*) FROM problem_clusters pc WHERE pc.cluster_id = cl.id)
+    """,
+}
+
+
+def count_violations(every: int) -> dict[str, int]:
+    with get_db() as conn:
+        return {name: conn.execute(sql, {"every": every}).fetchone()[0] for name, sql in CHECKS.items()}
+
+
+def stage_counts() -> dict[str, int]:
+    with get_db() as conn:
+        rows = conn.execute("SELECT stage, COUNT(*) AS c FROM post_state GROUP BY stage").fetchall()
+    return {row["stage"]: row["c"] for row in rows}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that failed stage writes are retried rather than skipped")
+    parser.add_argument("--posts", type=int, default=300)
+    parser.add_argument("--fail-every", type=int, default=5, help="Fail the cluster write of every Nth problem")
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    posts = list(generate_posts(args.posts, seed=9))
+    ok = True
+    with temporary_db():
+        with get_db() as conn:
+            conn.execute(FAIL_TRIGGER_SQL.format(every=args.fail_every))
+        first = run_pipeline(sources=[FakeSource(posts)], llm=FakeLLMService(), embedder=FakeEmbeddingService())
+        violations = count_violations(args.fail_every)
+        print(f"with failures: {first['processed']} processed, {first['errors']} errors, stages {stage_counts()}")
+
+        with get_db() as conn:
+            conn.execute("DROP TRIGGER fail_cluster_link")
+            conn.execute("UPDATE post_state SET next_attempt_at = NULL WHERE next_attempt_at IS NOT NULL")
+        second = run_pipeline(sources=[FakeSource([])], llm=FakeLLMService(), embedder=FakeEmbeddingService())
+        violations.update({f"{name} (after retry)": n for name, n in count_violations(args.fail_every).items()})
+        print(f"after retry:   {second['processed']} processed, {second['errors']} errors, stages {stage_counts()}")
+
+    print(f"batched writes: {config.DB_WRITE_BATCH_SIZE > 1}")
+    for name, count in violations.items():
+        if count:
+            ok = False
+            print(f"FAIL: {count} {name}")
+    if first["errors"] == 0 or second["processed"] != first["errors"]:
+        ok = False
+        print("FAIL: injected failures were not retried on the next run")
+    if ok:
+        print("OK: failed writes were retried and no stage was marked past them")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
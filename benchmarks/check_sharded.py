@@ -0,0 +1,68 @@
+import argparse
+import functools
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_posts
+from benchmarks.fakes import FakeEmbeddingService, FakeLLMService, FakeSource
+from benchmarks.run import temporary_db
+from core.utils import get_db
+from pipeline.run_pipeline import run_pipeline
+
+SNAPSHOT_SQL = """
+    SELECT rp.id AS post_id, ps.stage, p.problem_summary, p.final_score, pc.cluster_id, cl.size
+    FROM raw_posts rp
+    JOIN post_state ps ON ps.post_id = rp.id
+    LEFT JOIN problems p ON p.post_id = rp.id
+    LEFT JOIN problem_clusters pc ON pc.problem_id = p.id
+    LEFT JOIN clusters cl ON cl.id = pc.cluster_id
+    ORDER BY rp.id
+"""
+
+
+def run_snapshot(posts: list, workers: int, llm_latency: float) -> tuple[list[tuple], dict]:
+    with temporary_db():
+        summary = run_pipeline(
+            sources=[FakeSource(posts)],
+            workers=workers,
+            llm_factory=functools.partial(FakeLLMService, latency=llm_latency),
+            embedder_factory=FakeEmbeddingService,
+        )
+        with get_db() as conn:
+            rows = conn.execute(SNAPSHOT_SQL).fetchall()
+    snapshot = [
+        (r["post_id"], r["stage"], r["problem_summary"], round(r["final_score"] or 0, 6), r["cluster_id"], r["size"])
+        for r in rows
+    ]
+    return snapshot, summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check sharded pipeline output matches single-process output")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    posts = list(generate_posts(args.posts, seed=5))
+    single, single_summary = run_snapshot(posts, 1, args.llm_latency)
+    sharded, sharded_summary = run_snapshot(posts, args.workers, args.llm_latency)
+
+    print(f"single:  {single_summary['processed']} processed in {single_summary['elapsed']:.2f}s")
+    print(f"sharded: {sharded_summary['processed']} processed in {sharded_summary['elapsed']:.2f}s ({args.workers} workers)")
+    mismatches = [(a, b) for a, b in zip(single, sharded) if a != b]
+    if len(single) != len(sharded) or mismatches:
+        for a, b in mismatches[:10]:
+            print(f"  single={a}\n  sharded={b}")
+        print(f"MISMATCH: {len(mismatches)} rows differ")
+        return 1
+    print(f"OK: {len(single)} posts identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
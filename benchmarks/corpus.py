@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from sources.base_source import RawPost
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+SUBJECTS = [
+    "Freelancers", "Small agencies", "Indie SaaS founders", "Restaurant owners",
+    "E-commerce sellers", "Solo consultants", "Early-stage startups", "Landlords",
+]
+PROBLEMS = [
+    "struggle to chase unpaid invoices",
+    "waste hours reconciling payments across tools",
+    "can't find reliable contractors for short projects",
+    "lose customers because onboarding is confusing",
+    "have no simple way to track churn",
+    "spend too much on paid ads with unclear ROI",
+    "can't keep documentation in sync with the product",
+    "miss support tickets that arrive outside business hours",
+]
+CONTEXTS = [
+    "without hiring an accountant", "every month", "as they scale past ten clients",
+    "when switching from spreadsheets", "with their current CRM", "on a tight budget",
+]
+FILLER = [
+    "I've tried a few tools but none of them fit how we work.",
+    "Curious how others deal with this.",
+    "We are a team of three and this eats most of my week.",
+    "Spreadsheets worked at the start but they don't scale.",
+    "Happy to share what we've tried so far in the comments.",
+    "Is there something obvious I'm missing here?",
+    "Any recommendations would be appreciated, thanks!",
+]
+SUBREDDITS = ["SaaS", "startups", "Entrepreneur", "smallbusiness", "indiehackers"]
+
+
+def sample_texts(count: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} {rng.choice(CONTEXTS)}"
+        for _ in range(count)
+    ]
+
+
+def generate_posts(count: int, seed: int = 42, days: int = 30) -> Iterator[RawPost]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        subject, problem, context = rng.choice(SUBJECTS), rng.choice(PROBLEMS), rng.choice(CONTEXTS)
+        is_hn = rng.random() < 0.2
+        body = " ".join(
+            [f"{subject} like us {problem} {context}."] + rng.sample(FILLER, k=rng.randint(1, 4))
+        )
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        yield RawPost(
+            id=f"{'askhn' if is_hn else 'reddit'}_bench{seed}_{i}",
+            source="askhn" if is_hn else "reddit",
+            subreddit=None if is_hn else rng.choice(SUBREDDITS),
+            title=f"{subject} {problem}?",
+            body=body,
+            upvotes=int(rng.paretovariate(1.2) * 5),
+            comments=int(rng.paretovariate(1.5) * 2),
+            created_at=created_at.isoformat(),
+        )
+
+
+def archived_posts(limit: int | None = None) -> Iterator[RawPost]:
+    from pipeline.retention import iter_archived_posts
+
+    for i, row in enumerate(iter_archived_posts()):
+        if limit is not None and i >= limit:
+            return
+        yield RawPost(
+            id=row["id"],
+            source=row["source"],
+            subreddit=row["subreddit"],
+            title=row["title"],
+            body=row["body"] or "",
+            upvotes=row["upvotes"],
+            comments=row["comments"],
+            created_at=row["created_at"],
+        )
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_posts
+from benchmarks.run import temporary_db
+from core.utils import get_db, now_iso
+from core.writer import batched_writes
+
+ROWS_PER_POST = 4
+
+
+def write_post(post, vector_blob: bytes) -> None:
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO raw_posts
+                (id, source, subreddit, title, body, upvotes, comments, created_at, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (post.id, post.source, post.subreddit, post.title, post.body,
+             post.upvotes, post.comments, post.created_at, now_iso()),
+        )
+    with get_db() as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO problems
+                (post_id, problem_summary, target_group, market_type, buyer_type,
+                 pain_score, monetization_score, complexity_score, created_at)
+            VALUES (?, ?, 'Founders', 'B2B', 'Founders', 5, 5, 5, ?)
+            """,
+            (post.id, post.title, now_iso()),
+        )
+        problem_id = cursor.lastrowid
+    with get_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO embeddings (problem_id, vector) VALUES (?, ?)",
+            (problem_id, vector_blob),
+        )
+    with get_db() as conn:
+        conn.execute("UPDATE problems SET final_score = ? WHERE id = ?", (50.0, problem_id))
+
+
+def run(posts: list, batched: bool) -> dict[str, float]:
+    blob = os.urandom(1536)
+    with temporary_db():
+        start = time.perf_counter()
+        with batched_writes(batched) as writer:
+            for post in posts:
+                write_post(post, blob)
+        elapsed = time.perf_counter() - start
+        commits = writer.commits if writer else len(posts) * ROWS_PER_POST
+    rows = len(posts) * ROWS_PER_POST
+    return {"rows": rows, "commits": commits, "elapsed_s": round(elapsed, 3), "rows_per_s": round(rows / elapsed, 1)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare direct and batched database writes")
+    parser.add_argument("--posts", type=int, default=2000)
+    args = parser.parse_args()
+
+    posts = list(generate_posts(args.posts, seed=11))
+    report = {"direct": run(posts, batched=False), "batched": run(posts, batched=True)}
+    report["speedup"] = round(report["batched"]["rows_per_s"] / report["direct"]["rows_per_s"], 2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import json
+import logging
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.dedup import DuplicateDetector, band_buckets, to_signed
+from benchmarks.corpus import SCALES, generate_posts
+from benchmarks.run import SEED_CHUNK, temporary_db, timed
+from core.utils import get_db
+from core.writer import batched_writes
+
+
+def seed_index(count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    with get_db() as conn:
+        for start in range(0, count, SEED_CHUNK):
+            rows = []
+            for i in range(start, min(count, start + SEED_CHUNK)):
+                value = rng.getrandbits(64)
+                rows.extend((bucket, f"seed_{i}", to_signed(value)) for bucket in band_buckets(value))
+            conn.executemany("INSERT INTO simhash_lsh (bucket, post_id, simhash) VALUES (?, ?, ?)", rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure near-duplicate lookup latency")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="100k")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    posts = list(generate_posts(args.queries, seed=13))
+    detector = DuplicateDetector()
+
+    with temporary_db():
+        seed_index(SCALES[args.scale])
+        with batched_writes():
+            with get_db() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO raw_posts
+                        (id, source, subreddit, title, body, upvotes, comments, created_at, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [(p.id, p.source, p.subreddit, p.title, p.body, p.upvotes, p.comments,
+                      p.created_at, p.created_at) for p in posts],
+                )
+            queries = iter(posts)
+            duplicates = 0
+
+            def check() -> None:
+                nonlocal duplicates
+                if detector.check_and_index(next(queries)):
+                    duplicates += 1
+
+            result = timed(check, args.queries)
+
+    report = {"indexed": SCALES[args.scale], "duplicates": duplicates, "check_and_index": result}
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from benchmarks.corpus import sample_texts
+from core.config import config
+from embeddings.backends import EmbeddingBackend, OnnxBackend, TorchBackend
+
+
+def build_backend(name: str, threads: int) -> EmbeddingBackend:
+    if name == "torch":
+        return TorchBackend(threads=threads)
+    if name == "onnx":
+        return OnnxBackend(quantize=False, threads=threads)
+    if name == "onnx-int8":
+        return OnnxBackend(quantize=True, threads=threads)
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def run_backend(backend: EmbeddingBackend, texts: list[str], repeats: int) -> tuple[np.ndarray, float]:
+    backend.encode(texts[:8])
+    best = float("inf")
+    vectors = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectors = backend.encode(texts)
+        best = min(best, time.perf_counter() - start)
+    return vectors, len(texts) / best
+
+
+def agreement(reference: np.ndarray, candidate: np.ndarray, threshold: float) -> dict:
+    row_cosine = np.sum(reference * candidate, axis=1)
+    ref_pairs = reference @ reference.T >= threshold
+    cand_pairs = candidate @ candidate.T >= threshold
+    upper = np.triu_indices(len(reference), k=1)
+    return {
+        "cosine_mean": float(row_cosine.mean()),
+        "cosine_min": float(row_cosine.min()),
+        "pair_decision_agreement": float(np.mean(ref_pairs[upper] == cand_pairs[upper])),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts)
+    results: dict[str, dict] = {}
+    reference: np.ndarray | None = None
+
+    for name in args.backends:
+        vectors, throughput = run_backend(build_backend(name, args.threads), texts, args.repeats)
+        entry = {"texts_per_second": round(throughput, 1)}
+        if reference is None:
+            reference = vectors
+        else:
+            entry.update(agreement(reference, vectors, config.SIMILARITY_THRESHOLD))
+        results[name] = entry
+        print(f"{name}: {json.dumps(entry)}")
+
+    report = {"texts": args.texts, "threads": args.threads, "reference": args.backends[0], "backends": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
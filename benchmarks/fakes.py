@@ -0,0 +1,80 @@
+import json
+import time
+import zlib
+from typing import Any
+
+import numpy as np
+
+from analysis.llm_service import LLMService
+from benchmarks.corpus import PROBLEMS, SUBJECTS
+from core.config import config
+from embeddings.embedding_service import embedding_text, store_embedding
+from sources.base_source import BaseSource, RawPost
+
+MARKET_TYPES = ["B2B", "Consumer", "Tech", "Hybrid"]
+
+
+class FakeSource(BaseSource):
+    name = "fake"
+
+    def __init__(self, posts: list[RawPost], latency: float = 0.0) -> None:
+        self._posts = posts
+        self._latency = latency
+
+    def fetch(self) -> list[RawPost]:
+        if self._latency:
+            time.sleep(self._latency)
+        return list(self._posts)
+
+
+class FakeLLMService(LLMService):
+    def __init__(self, latency: float = 0.0, no_problem_rate: float = 0.1) -> None:
+        self._latency = latency
+        self._no_problem_rate = no_problem_rate
+        self.calls = 0
+
+    def extract_problem(self, title: str, body: str) -> dict[str, Any] | None:
+        self.calls += 1
+        if self._latency:
+            time.sleep(self._latency)
+        return self._parse_json(self.fake_response(title))
+
+    def fake_response(self, title: str) -> str:
+        h = zlib.crc32(title.encode("utf-8"))
+        if (h % 1000) / 1000 < self._no_problem_rate:
+            summary = "No clear problem identified"
+        else:
+            summary = f"{SUBJECTS[h % len(SUBJECTS)]} {PROBLEMS[(h >> 8) % len(PROBLEMS)]}"
+        return json.dumps({
+            "problem_summary": summary,
+            "target_group": SUBJECTS[h % len(SUBJECTS)],
+            "market_type": MARKET_TYPES[(h >> 4) % len(MARKET_TYPES)],
+            "buyer_type": "Business owners",
+            "pain_score": 1 + (h >> 12) % 10,
+            "monetization_score": 1 + (h >> 16) % 10,
+            "complexity_score": 1 + (h >> 20) % 10,
+        })
+
+
+class FakeEmbeddingService:
+    def __init__(self, latency: float = 0.0, dim: int = config.EMBEDDING_DIM) -> None:
+        self._latency = latency
+        self._dim = dim
+
+    def warm_up(self) -> None:
+        pass
+
+    def embed(self, text: str) -> np.ndarray:
+        if self._latency:
+            time.sleep(self._latency)
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        vec = rng.standard_normal(self._dim).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        return np.vstack([self.embed(t) for t in texts])
+
+    def embed_and_store(self, problem_id: int, problem_summary: str, target_group: str) -> np.ndarray:
+        vec = self.embed(embedding_text(problem_summary, target_group))
+        store_embedding(problem_id, vec)
+        return vec
@@ -0,0 +1,57 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "openai", "praw", "requests", "onnxruntime")
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    imported: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not parts[1].isdigit():
+            continue
+        name = parts[2]
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1000.0, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check import time of pipeline entry points")
+    parser.add_argument("--module", action="append", default=None)
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    args = parser.parse_args()
+
+    modules = args.module or ["pipeline.run_pipeline", "core.utils"]
+    failed = False
+    for module in modules:
+        elapsed_ms, imported = measure_import(module)
+        heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+        status = "ok"
+        if elapsed_ms > args.budget_ms:
+            status = f"over budget ({args.budget_ms:.0f}ms)"
+            failed = True
+        if heavy:
+            status = f"eager heavy imports: {', '.join(heavy)}"
+            failed = True
+        print(f"{module}: {elapsed_ms:.1f}ms {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.queries import SORT_KEYS, DashboardFilters, build_query, page_cursor
+from app.render import render_page
+from benchmarks.corpus import SCALES
+from benchmarks.fakes import MARKET_TYPES
+from benchmarks.run import seed_database, temporary_db, timed
+from core.config import config
+from pipeline.snapshot import get_dashboard_db, publish_snapshot
+
+PAGES = (1, 10, 100, 1000)
+
+
+def offset_query(filters: DashboardFilters, sort: str, page: int, page_size: int) -> tuple[str, list]:
+    query, params = build_query(filters, sort=sort, limit=page_size)
+    return query.replace("LIMIT ?", "LIMIT ? OFFSET ?"), params + [(page - 1) * page_size]
+
+
+def cursor_before(filters: DashboardFilters, sort: str, page: int, page_size: int) -> tuple | None:
+    if page == 1:
+        return None
+    query, params = offset_query(filters, sort, page - 1, page_size)
+    with get_dashboard_db() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return page_cursor(rows[-1], sort)
+
+
+def bench_sort(filters: DashboardFilters, sort: str, page_size: int, iterations: int) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    with get_dashboard_db() as conn:
+        query, params = build_query(filters, sort=sort, after=(0,) * len(SORT_KEYS[sort]), limit=page_size)
+        plan = [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    results["plan"] = plan
+
+    for page in PAGES:
+        after = cursor_before(filters, sort, page, page_size)
+        query, params = build_query(filters, sort=sort, after=after, limit=page_size)
+
+        def keyset(query=query, params=params) -> None:
+            with get_dashboard_db() as conn:
+                conn.execute(query, params).fetchall()
+
+        query_offset, params_offset = offset_query(filters, sort, page, page_size)
+
+        def offset(query=query_offset, params=params_offset) -> None:
+            with get_dashboard_db() as conn:
+                conn.execute(query, params).fetchall()
+
+        results[f"page_{page}"] = {
+            "keyset": timed(keyset, iterations),
+            "offset": timed(offset, max(1, iterations // 5)),
+        }
+
+    with get_dashboard_db() as conn:
+        query, params = build_query(filters, sort=sort, limit=page_size)
+        rows = conn.execute(query, params).fetchall()
+    results["render_page"] = timed(lambda: render_page(rows), iterations)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare keyset and OFFSET pagination at depth")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="100k")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--live", action="store_true", help="Query the live database instead of a published snapshot")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    count = SCALES[args.scale]
+    page_size = config.DASHBOARD_PAGE_SIZE
+    filters = DashboardFilters(markets=list(MARKET_TYPES), min_score=0)
+    with temporary_db():
+        seed_database(count, max(1, count // 100))
+        if args.live:
+            config.SNAPSHOT_ENABLED = False
+        else:
+            publish_snapshot()
+        report = {
+            "problems": count,
+            "live": args.live,
+            "page_size": page_size,
+            "score": bench_sort(filters, "score", page_size, args.iterations),
+            "momentum": bench_sort(filters, "momentum", page_size, args.iterations),
+        }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
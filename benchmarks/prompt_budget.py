@@ -0,0 +1,95 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.llm_service import SYSTEM_PROMPT
+from analysis.prompt_prep import estimate_tokens, prepare_prompt
+from benchmarks.corpus import FILLER, generate_posts
+from core.config import config
+from core.utils import get_db
+from sources.base_source import RawPost
+
+NOISE = [
+    "**EDIT:** thanks everyone for the replies, really appreciate it!",
+    "Sorry for formatting, I'm on mobile.",
+    "Here's the [landing page](https://example.com/landing?utm_source=reddit) if anyone is curious.",
+    "> Quoting the original thread: https://news.ycombinator.com/item?id=123456",
+    "```\nSELECT * FROM invoices WHERE status = 'unpaid';\n```",
+    "## Background",
+    "- We use Stripe\n- We use QuickBooks\n- We use a spreadsheet",
+    "Not sure if this is the right sub for this, mods please remove if not.",
+    "Our story so far is long, we started in a garage, moved to a small office and then went remote during 2020.",
+    "Some days are better than others and the team keeps morale high with Friday lunches.",
+    "--\nJohn, founder of ExampleCo\nhttps://example.com | @example",
+]
+
+
+def noisy_posts(count: int, seed: int = 42) -> list[RawPost]:
+    rng = random.Random(seed)
+    posts = []
+    for post in generate_posts(count, seed=seed):
+        parts = rng.sample(FILLER, k=3) + rng.sample(NOISE, k=rng.randint(3, len(NOISE)))
+        rng.shuffle(parts)
+        parts.sort(key=lambda part: part.startswith("--"))
+        post.body = "\n\n".join([post.body] + parts)[:4000] if rng.random() > 0.1 else ""
+        posts.append(post)
+    return posts
+
+
+def db_posts(limit: int) -> list[RawPost]:
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM raw_posts WHERE body IS NOT NULL ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [
+        RawPost(row["id"], row["source"], row["subreddit"], row["title"], row["body"],
+                row["upvotes"], row["comments"], row["created_at"])
+        for row in rows
+    ]
+
+
+def measure(posts: list[RawPost], budget: int) -> dict[str, float]:
+    system = estimate_tokens(SYSTEM_PROMPT)
+    before = after = body_before = body_after = 0
+    start = time.perf_counter()
+    for post in posts:
+        baseline = f"Title: {post.title}\n\nBody: {post.body[:3000]}" if post.body else f"Title: {post.title}"
+        before += system + estimate_tokens(baseline)
+        prompt = prepare_prompt(post.title, post.body, budget)
+        body_before += estimate_tokens(post.body[:3000])
+        body_after += prompt.tokens
+        prepared = f"Title: {prompt.title}\n\nBody: {prompt.body}" if prompt.body else f"Title: {prompt.title}"
+        after += system + estimate_tokens(prepared)
+    elapsed = time.perf_counter() - start
+    return {
+        "posts": len(posts),
+        "budget": budget,
+        "input_tokens_before": before,
+        "input_tokens_after": after,
+        "saved_pct": round(100 * (1 - after / before), 1) if before else 0.0,
+        "body_tokens_before": body_before,
+        "body_tokens_after": body_after,
+        "body_saved_pct": round(100 * (1 - body_after / body_before), 1) if body_before else 0.0,
+        "prep_ms_per_post": round(1000 * elapsed / max(1, len(posts)), 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure input-token savings from prompt preparation")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--budget", type=int, default=config.PROMPT_TOKEN_BUDGET)
+    parser.add_argument("--from-db", action="store_true", help="Use stored raw posts instead of the synthetic corpus")
+    args = parser.parse_args()
+
+    posts = db_posts(args.posts) if args.from_db else noisy_posts(args.posts)
+    print(json.dumps(measure(posts, args.budget), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
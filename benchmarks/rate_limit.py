@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import generate_posts
+from benchmarks.stub_server import StubServer
+from core.config import config
+from core.metrics import metrics
+from core.ratelimit import RateLimiter, set_budget_share
+
+
+def call(url: str, limiter: RateLimiter | None) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            status, headers = resp.status, resp.headers
+    except urllib.error.HTTPError as exc:
+        status, headers = exc.code, exc.headers
+    if limiter is not None:
+        limiter.update(headers, status)
+    return status
+
+
+def run_threads(url: str, limiter: RateLimiter | None, threads: int, seconds: float) -> dict[str, float]:
+    statuses: list[int] = []
+    lock = threading.Lock()
+    start = time.monotonic()
+    deadline = start + seconds
+
+    def worker() -> None:
+        while time.monotonic() < deadline:
+            if limiter is not None:
+                limiter.acquire()
+            status = call(url, limiter)
+            with lock:
+                statuses.append(status)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return summarize(statuses, time.monotonic() - start)
+
+
+def run_asyncio(url: str, limiter: RateLimiter, tasks: int, seconds: float) -> dict[str, float]:
+    statuses: list[int] = []
+
+    async def worker(deadline: float) -> None:
+        while time.monotonic() < deadline:
+            await limiter.acquire_async()
+            statuses.append(await asyncio.to_thread(call, url, limiter))
+
+    async def main() -> None:
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(*(worker(deadline) for _ in range(tasks)))
+
+    start = time.monotonic()
+    asyncio.run(main())
+    return summarize(statuses, time.monotonic() - start)
+
+
+def run_llm(base_url: str, threads: int, count: int) -> dict[str, float]:
+    from analysis.llm_service import LLMService
+
+    config.OPENAI_BASE_URL = f"{base_url}/v1"
+    config.OPENAI_API_KEY = config.OPENAI_API_KEY or "stub"
+    posts = list(generate_posts(count, seed=3))
+    llm = LLMService()
+    results: list[bool] = []
+    lock = threading.Lock()
+    queue = iter(posts)
+    start = time.monotonic()
+
+    def worker() -> None:
+        while True:
+            with lock:
+                post = next(queue, None)
+            if post is None:
+                return
+            ok = llm.extract_problem(post.title, post.body) is not None
+            with lock:
+                results.append(ok)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.monotonic() - start
+    return {
+        "requests": len(results),
+        "succeeded": sum(results),
+        "rate_limited": metrics.counter("llm.rate_limited"),
+        "per_second": round(len(results) / elapsed, 2),
+    }
+
+
+def run_askhn(base_url: str, pages: int) -> dict[str, float]:
+    from sources.askhn_source import AskHNSource
+
+    config.ASKHN_API_URL = f"{base_url}/api/v1/search_by_date"
+    config.ASKHN_FETCH_LIMIT = pages * 50
+    start = time.monotonic()
+    posts = AskHNSource().fetch()
+    elapsed = time.monotonic() - start
+    return {"posts": len(posts), "pages": pages, "per_second": round(pages / elapsed, 2)}
+
+
+def summarize(statuses: list[int], elapsed: float) -> dict[str, float]:
+    ok = statuses.count(200)
+    return {
+        "requests": len(statuses),
+        "ok": ok,
+        "rejected_429": statuses.count(429),
+        "ok_per_second": round(ok / elapsed, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the shared rate limiter against a rate-limited stub server")
+    parser.add_argument("--rate", type=float, default=20.0, help="Server limit in requests per second")
+    parser.add_argument("--burst", type=float, default=5.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--headroom", type=float, default=0.95, help="Fraction of the server limit the client budgets for")
+    parser.add_argument("--tpm", type=float, default=0, help="OpenAI token budget per minute (0 = requests only)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    stub = StubServer(rate=args.rate, burst=args.burst, latency=0.01)
+    budget = args.rate * 60 * args.headroom
+    burst_seconds = max(1.0, args.burst - 1) / args.rate
+    report = {"server_rate": args.rate, "server_burst": args.burst}
+    try:
+        report["unlimited_threads"] = run_threads(f"{stub.url}/ping", None, args.concurrency, args.seconds)
+        report["limited_threads"] = run_threads(
+            f"{stub.url}/threads", RateLimiter("threads", budget, burst_seconds=burst_seconds),
+            args.concurrency, args.seconds,
+        )
+        report["limited_asyncio"] = run_asyncio(
+            f"{stub.url}/asyncio", RateLimiter("asyncio", budget, burst_seconds=burst_seconds),
+            args.concurrency, args.seconds,
+        )
+
+        config.RATE_LIMIT_OPENAI_RPM = budget
+        config.RATE_LIMIT_ALGOLIA_RPM = budget
+        config.RATE_LIMIT_OPENAI_TPM = args.tpm
+        config.RATE_LIMIT_BURST_SECONDS = burst_seconds
+        set_budget_share(1.0)
+        report["llm_service"] = run_llm(stub.url, args.concurrency, int(args.rate * args.seconds))
+        report["askhn_source"] = run_askhn(stub.url, int(args.rate))
+        report["openai_limiter_throttled"] = metrics.counter("ratelimit.openai.throttled")
+        report["stub"] = dict(stub.stats)
+    finally:
+        stub.close()
+
+    print(json.dumps(report, indent=2))
+    rejected = sum(v for k, v in stub.stats.items() if k.endswith("429") and not k.startswith("/ping"))
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from analysis.clustering import ClusteringService
+from analysis.scoring import ScoringService
+from app.queries import DashboardFilters, build_query
+from benchmarks.corpus import SCALES, archived_posts, generate_posts
+from benchmarks.fakes import MARKET_TYPES, FakeEmbeddingService, FakeLLMService, FakeSource
+from core.config import config
+from core.utils import blob_to_vector, get_db, get_snapshot_db, init_db, now_iso, vector_to_blob
+from pipeline.run_pipeline import run_pipeline
+from pipeline.snapshot import publish_snapshot
+from sources.base_source import RawPost
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SEED_CHUNK = 10_000
+
+
+def timed(fn: Callable[[], object], iterations: int) -> dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    arr = np.array(samples) * 1e6
+    return {
+        "iterations": iterations,
+        "mean_us": round(float(arr.mean()), 2),
+        "p50_us": round(float(np.percentile(arr, 50)), 2),
+        "p95_us": round(float(np.percentile(arr, 95)), 2),
+        "ops_per_s": round(iterations / float(np.sum(samples)), 1),
+    }
+
+
+@contextmanager
+def temporary_db() -> Iterator[Path]:
+    original, original_snapshot = config.DB_PATH, config.SNAPSHOT_PATH
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        config.DB_PATH = Path(tmp) / "bench.db"
+        config.SNAPSHOT_PATH = Path(tmp) / "bench-dashboard.db"
+        try:
+            init_db()
+            yield config.DB_PATH
+        finally:
+            config.DB_PATH, config.SNAPSHOT_PATH = original, original_snapshot
+
+
+def random_unit_vectors(count: int, rng: np.random.Generator) -> np.ndarray:
+    vecs = rng.standard_normal((count, config.EMBEDDING_DIM)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def seed_database(post_count: int, cluster_count: int, seed: int = 42) -> None:
+    rng = np.random.default_rng(seed)
+    now = now_iso()
+    with get_db() as conn:
+        for start in range(0, cluster_count, SEED_CHUNK):
+            n = min(SEED_CHUNK, cluster_count - start)
+            conn.executemany(
+                "INSERT INTO clusters (centroid, size, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                [(vector_to_blob(v), int(rng.integers(1, 20)), now, now) for v in random_unit_vectors(n, rng)],
+            )
+
+        chunk: list = []
+        for i, post in enumerate(generate_posts(post_count, seed=seed), start=1):
+            chunk.append((post, i))
+            if len(chunk) == SEED_CHUNK:
+                _seed_chunk(conn, chunk, cluster_count, rng)
+                chunk = []
+        if chunk:
+            _seed_chunk(conn, chunk, cluster_count, rng)
+
+
+def _seed_chunk(conn, chunk: list, cluster_count: int, rng: np.random.Generator) -> None:
+    conn.executemany(
+        """
+        INSERT INTO raw_posts
+            (id, source, subreddit, title, body, upvotes, comments, created_at, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (p.id, p.source, p.subreddit, p.title, p.body, p.upvotes, p.comments, p.created_at, p.created_at)
+            for p, _ in chunk
+        ],
+    )
+    scores = rng.uniform(0, 100, size=(len(chunk), 2))
+    conn.executemany(
+        """
+        INSERT INTO problems
+            (id, post_id, problem_summary, target_group, market_type, buyer_type,
+             pain_score, monetization_score, complexity_score, momentum_score, final_score, created_at)
+        VALUES (?, ?, ?, ?, ?, 'Business owners', 5, 5, 5, ?, ?, ?)
+        """,
+        [
+            (i, p.id, p.title, p.title.split(" ")[0], MARKET_TYPES[i % len(MARKET_TYPES)],
+             float(s[0]) / 5, float(s[1]), p.created_at)
+            for (p, i), s in zip(chunk, scores)
+        ],
+    )
+    if cluster_count:
+        conn.executemany(
+            "INSERT INTO problem_clusters (problem_id, cluster_id) VALUES (?, ?)",
+            [(i, int(rng.integers(1, cluster_count + 1))) for _, i in chunk],
+        )
+
+
+def bench_blobs(rng: np.random.Generator) -> dict[str, dict]:
+    vec = random_unit_vectors(1, rng)[0]
+    blob = vector_to_blob(vec)
+    return {
+        "vector_to_blob": timed(lambda: vector_to_blob(vec), 5000),
+        "blob_to_vector": timed(lambda: blob_to_vector(blob), 5000),
+    }
+
+
+def bench_db_stages(post_count: int, iterations: int, rng: np.random.Generator) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    iterations = min(iterations, post_count)
+    with temporary_db():
+        seed_database(post_count, max(1, post_count // 10))
+
+        clusterer = ClusteringService()
+        vectors = iter(random_unit_vectors(iterations, rng))
+        ids = iter(range(1, iterations + 1))
+        results["assign_cluster"] = timed(lambda: clusterer.assign_cluster(next(ids), next(vectors)), iterations)
+
+        scorer = ScoringService()
+        problem_ids = [int(i) for i in rng.integers(1, post_count + 1, size=iterations)]
+        ids = iter(problem_ids)
+        results["score_problem"] = timed(lambda: scorer.score_problem(next(ids)), iterations)
+
+        results["publish_snapshot"] = timed(publish_snapshot, 1)
+        filters = DashboardFilters(markets=list(MARKET_TYPES), min_score=0)
+        week_ago = datetime.fromtimestamp(time.time() - 7 * 86400, tz=timezone.utc).isoformat()
+        for name, kwargs in {
+            "build_query_today": {"time_filter": now_iso()[:10]},
+            "build_query_trending": {"time_filter": week_ago, "sort": "momentum"},
+            "build_query_alltime": {"limit": 100},
+        }.items():
+            def run_query(kwargs=kwargs) -> None:
+                query, params = build_query(filters, **kwargs)
+                with get_snapshot_db() as conn:
+                    conn.execute(query, params).fetchall()
+            results[name] = timed(run_query, max(5, iterations // 10))
+    return results
+
+
+def load_corpus(corpus: str, post_count: int) -> list[RawPost]:
+    if corpus == "archived":
+        return list(archived_posts(limit=post_count))
+    return list(generate_posts(post_count, seed=7))
+
+
+def bench_pipeline(posts: list[RawPost], llm_latency: float, embed_latency: float) -> dict[str, float]:
+    post_count = len(posts)
+    with temporary_db():
+        start = time.perf_counter()
+        summary = run_pipeline(
+            sources=[FakeSource(posts)],
+            llm=FakeLLMService(latency=llm_latency),
+            embedder=FakeEmbeddingService(latency=embed_latency),
+        )
+        elapsed = time.perf_counter() - start
+    return {
+        "posts": post_count,
+        "processed": summary["processed"],
+        "errors": summary["errors"],
+        "elapsed_s": round(elapsed, 3),
+        "posts_per_s": round(post_count / elapsed, 1),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RESULTS_DIR.parent.parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, entry in current["micro"].items():
+        old = baseline.get("micro", {}).get(name)
+        if not old:
+            continue
+        ratio = entry["p50_us"] / old["p50_us"] if old["p50_us"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{name:24s} {old['p50_us']:>10.1f}us -> {entry['p50_us']:>10.1f}us  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    old_macro = baseline.get("macro", {}).get("run_pipeline")
+    new_macro = current["macro"].get("run_pipeline")
+    if old_macro and new_macro and old_macro["posts"] == new_macro["posts"]:
+        ratio = old_macro["posts_per_s"] / new_macro["posts_per_s"] if new_macro["posts_per_s"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{'run_pipeline':24s} {old_macro['posts_per_s']:>10.1f}/s -> {new_macro['posts_per_s']:>10.1f}/s {flag}")
+        if flag:
+            regressions.append("run_pipeline")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the pipeline benchmark suite")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--pipeline-posts", type=int, default=1000)
+    parser.add_argument("--corpus", choices=("synthetic", "archived"), default="synthetic",
+                        help="Feed the pipeline benchmark generated posts or posts read back from ARCHIVE_DIR")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--embed-latency", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(42)
+    random.seed(42)
+    post_count = SCALES[args.scale]
+
+    micro = bench_blobs(rng)
+    micro.update(bench_db_stages(post_count, args.iterations, rng))
+    posts = load_corpus(args.corpus, args.pipeline_posts)
+    if not posts:
+        parser.error(f"no archived posts found in {config.ARCHIVE_DIR}")
+    macro = {"run_pipeline": bench_pipeline(posts, args.llm_latency, args.embed_latency)}
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": now_iso(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "posts": post_count,
+        "corpus": args.corpus,
+        "micro": micro,
+        "macro": macro,
+    }
+
+    output = args.output or RESULTS_DIR / f"{report['commit']}-{args.scale}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), report, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
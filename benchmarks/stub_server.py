@@ -0,0 +1,168 @@
+import json
+import math
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from benchmarks.corpus import generate_posts
+from benchmarks.fakes import FakeLLMService
+
+ChatHandler = Callable[[str, list[dict[str, str]]], str]
+
+
+class StubBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.level = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> tuple[bool, float, float]:
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.burst, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.level < 1:
+                return False, self.level, (1 - self.level) / self.rate
+            self.level -= 1
+            return True, self.level, (self.burst - self.level) / self.rate
+
+
+def default_chat_handler(model: str, messages: list[dict[str, str]]) -> str:
+    title = messages[-1]["content"].split("\n", 1)[0].removeprefix("Title: ")
+    return FakeLLMService(no_problem_rate=0.1).fake_response(title)
+
+
+class StubServer:
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: float = 5.0,
+        latency: float = 0.0,
+        chat_handler: ChatHandler = default_chat_handler,
+        model_latency: dict[str, float] | None = None,
+    ) -> None:
+        self.stats: Counter[str] = Counter()
+        self.max_in_flight: Counter[str] = Counter()
+        self._in_flight: Counter[str] = Counter()
+        self._buckets: dict[str, StubBucket] = {}
+        self._rate = rate
+        self._burst = burst
+        self._latency = latency
+        self._model_latency = model_latency or {}
+        self._chat_handler = chat_handler
+        self._hits = [
+            {
+                "objectID": post.id, "title": post.title, "story_text": post.body,
+                "points": post.upvotes, "num_comments": post.comments,
+                "created_at_i": 1_700_000_000 + i,
+            }
+            for i, post in enumerate(generate_posts(200, seed=7))
+        ]
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _bucket(self, endpoint: str) -> StubBucket:
+        with self._lock:
+            if endpoint not in self._buckets:
+                self._buckets[endpoint] = StubBucket(self._rate, self._burst)
+            return self._buckets[endpoint]
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                self._dispatch()
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                self._dispatch(json.loads(self.rfile.read(length) or b"{}"))
+
+            def _dispatch(self, payload: dict[str, Any] | None = None) -> None:
+                endpoint = self.path.split("?", 1)[0]
+                ok, remaining, reset = stub._bucket(endpoint).take()
+                headers = {
+                    "x-ratelimit-limit-requests": str(stub._burst),
+                    "x-ratelimit-remaining-requests": str(math.floor(remaining)),
+                    "x-ratelimit-reset-requests": f"{reset:.3f}s",
+                }
+                if not ok:
+                    stub.stats[f"{endpoint} 429"] += 1
+                    headers["retry-after"] = f"{reset:.3f}"
+                    self._send(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}}, headers)
+                    return
+                stub.stats[f"{endpoint} 200"] += 1
+                if endpoint == "/v1/chat/completions":
+                    self._chat(payload or {}, headers)
+                elif endpoint == "/api/v1/search_by_date":
+                    self._send(200, {"hits": stub._hits[:50]}, headers)
+                else:
+                    if stub._latency:
+                        time.sleep(stub._latency)
+                    self._send(200, {"ok": True}, headers)
+
+            def _chat(self, payload: dict[str, Any], headers: dict[str, str]) -> None:
+                model = payload.get("model", "")
+                messages = payload.get("messages", [])
+                delay = stub._model_latency.get(model, stub._latency)
+                with stub._lock:
+                    stub._in_flight[model] += 1
+                    stub.max_in_flight[model] = max(stub.max_in_flight[model], stub._in_flight[model])
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    content = stub._chat_handler(model, messages)
+                finally:
+                    with stub._lock:
+                        stub._in_flight[model] -= 1
+                prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+                completion_tokens = len(content) // 4
+                stub.stats[f"model {model}"] += 1
+                self._send(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }, headers)
+
+            def _send(self, code: int, body: dict[str, Any], headers: dict[str, str]) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, fmt: str, *args: Any) -> None:
+                pass
+
+        return Handler
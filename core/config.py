@@ -9,11 +9,21 @@ load_dotenv(BASE_DIR / ".env")
 class Config:
     BASE_DIR: Path = BASE_DIR
     DB_PATH: Path = BASE_DIR / "data" / "app.db"
+    DB_WRITE_BATCH_SIZE: int = int(os.getenv("DB_WRITE_BATCH_SIZE", "200"))
+    DB_WRITE_BATCH_SECONDS: float = float(os.getenv("DB_WRITE_BATCH_SECONDS", "1.0"))
     LOG_DIR: Path = BASE_DIR / "logs"
     LOG_FILE: Path = LOG_DIR / "pipeline.log"
 
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = "gpt-4.1-mini"
+    OPENAI_BASE_URL: str | None = os.getenv("OPENAI_BASE_URL") or None
+    OPENAI_INPUT_COST_PER_MTOK: float = float(os.getenv("OPENAI_INPUT_COST_PER_MTOK", "0.40"))
+    OPENAI_OUTPUT_COST_PER_MTOK: float = float(os.getenv("OPENAI_OUTPUT_COST_PER_MTOK", "1.60"))
+    LLM_TIERS: str = os.getenv("LLM_TIERS", "")
+    LLM_BORDERLINE_MIN: float = float(os.getenv("LLM_BORDERLINE_MIN", "4"))
+    LLM_BORDERLINE_MAX: float = float(os.getenv("LLM_BORDERLINE_MAX", "6"))
+    PROMPT_PREP_ENABLED: bool = os.getenv("PROMPT_PREP_ENABLED", "true").lower() in ("1", "true", "yes")
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "400"))
     OPENAI_TIMEOUT: int = 60
     OPENAI_MAX_RETRIES: int = 5
 
@@ -26,15 +36,66 @@ class Config:
     ]
     REDDIT_FETCH_LIMIT: int = 100
 
+    PIPELINE_MAX_ATTEMPTS: int = int(os.getenv("PIPELINE_MAX_ATTEMPTS", "5"))
+    PIPELINE_RETRY_BASE_SECONDS: float = float(os.getenv("PIPELINE_RETRY_BASE_SECONDS", "600"))
+    PIPELINE_RETRY_MAX_SECONDS: float = 86400
+
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    DEDUP_MAX_HAMMING: int = int(os.getenv("DEDUP_MAX_HAMMING", "3"))
+    DEDUP_MIN_TOKENS: int = 12
+
+    RETENTION_DAYS: int = int(os.getenv("RETENTION_DAYS", "90"))
+    RETENTION_VACUUM_PAGES: int = int(os.getenv("RETENTION_VACUUM_PAGES", "0"))
+    ARCHIVE_DIR: Path = Path(os.getenv("ARCHIVE_DIR") or BASE_DIR / "data" / "archive")
+
+    SNAPSHOT_ENABLED: bool = os.getenv("SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+    SNAPSHOT_PATH: Path = Path(os.getenv("SNAPSHOT_PATH") or BASE_DIR / "data" / "dashboard.db")
+    SNAPSHOT_MIN_INTERVAL: float = float(os.getenv("SNAPSHOT_MIN_INTERVAL", "300"))
+
+    RATE_LIMIT_OPENAI_RPM: float = float(os.getenv("RATE_LIMIT_OPENAI_RPM", "500"))
+    RATE_LIMIT_OPENAI_TPM: float = float(os.getenv("RATE_LIMIT_OPENAI_TPM", "200000"))
+    RATE_LIMIT_REDDIT_RPM: float = float(os.getenv("RATE_LIMIT_REDDIT_RPM", "90"))
+    RATE_LIMIT_ALGOLIA_RPM: float = float(os.getenv("RATE_LIMIT_ALGOLIA_RPM", "150"))
+    RATE_LIMIT_BURST_SECONDS: float = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "5"))
+    RATE_LIMIT_DEFAULT_BACKOFF: float = 5.0
+
+    DAEMON_MIN_INTERVAL: float = float(os.getenv("DAEMON_MIN_INTERVAL", "60"))
+    DAEMON_MAX_INTERVAL: float = float(os.getenv("DAEMON_MAX_INTERVAL", "3600"))
+    DAEMON_TARGET_NEW_POSTS: float = float(os.getenv("DAEMON_TARGET_NEW_POSTS", "5"))
+    DAEMON_RATE_SMOOTHING: float = 0.3
+    DAEMON_HEALTH_HOST: str = "127.0.0.1"
+    DAEMON_HEALTH_PORT: int = int(os.getenv("DAEMON_HEALTH_PORT", "8765"))
+    DAEMON_MAX_RSS_MB: int = int(os.getenv("DAEMON_MAX_RSS_MB", "0"))
+
     SIMILARITY_THRESHOLD: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.85"))
     MIN_UPVOTES: int = int(os.getenv("MIN_UPVOTES", "5"))
 
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     EMBEDDING_DIM: int = 384
+    EMBEDDING_CACHE_DIR: Path = Path(
+        os.getenv("EMBEDDING_CACHE_DIR", str(BASE_DIR / "data" / "models" / EMBEDDING_MODEL))
+    )
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_PATH: Path = Path(
+        os.getenv("EMBEDDING_ONNX_PATH", str(BASE_DIR / "data" / "models" / f"{EMBEDDING_MODEL}.onnx"))
+    )
+    EMBEDDING_ONNX_QUANTIZE: bool = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").lower() in ("1", "true", "yes")
+    EMBEDDING_THREADS: int = int(os.getenv("EMBEDDING_THREADS", "0"))
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256
+    EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", str(os.cpu_count() or 1)))
+    EMBEDDING_WORKER_THREADS: int = 1
+    EMBEDDING_CORPUS_CHUNK: int = 256
 
     ASKHN_API_URL: str = "https://hn.algolia.com/api/v1/search_by_date"
     ASKHN_FETCH_LIMIT: int = 100
 
+    METRICS_FILE: str = os.getenv("METRICS_FILE", "")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+    PROFILE_TRACEMALLOC_FRAMES: int = 10
+    DASHBOARD_PAGE_SIZE: int = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+    DASHBOARD_PROFILE: bool = os.getenv("DASHBOARD_PROFILE", "").lower() in ("1", "true", "yes")
+
     STREAMLIT_PORT: int = int(os.getenv("STREAMLIT_PORT", "8501"))
 
 
@@ -0,0 +1,156 @@
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Generator
+
+from core.logger import get_logger
+from core.utils import get_db
+
+log = get_logger(__name__)
+
+MAX_SAMPLES = 10_000
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RunMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._samples: dict[str, list[float]] = {}
+        self._seen: dict[str, int] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = {}
+            self._samples = {}
+            self._seen = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._observe(name, value)
+
+    def _observe(self, name: str, value: float) -> None:
+        samples = self._samples.setdefault(name, [])
+        seen = self._seen.get(name, 0) + 1
+        self._seen[name] = seen
+        if len(samples) < MAX_SAMPLES:
+            samples.append(value)
+        else:
+            slot = random.randrange(seen)
+            if slot < MAX_SAMPLES:
+                samples[slot] = value
+
+    @contextmanager
+    def timer(self, name: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def drain(self) -> dict[str, Any]:
+        with self._lock:
+            snapshot = {"counters": self._counters, "samples": self._samples}
+            self._counters = {}
+            self._samples = {}
+            self._seen = {}
+        return snapshot
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        with self._lock:
+            for name, value in snapshot.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            for name, values in snapshot.get("samples", {}).items():
+                for value in values:
+                    self._observe(name, value)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            seen = dict(self._seen)
+
+        histograms = {}
+        for name, values in samples.items():
+            entry = {"count": seen.get(name, len(values)), "sum": round(sum(values), 6)}
+            for pct in PERCENTILES:
+                entry[f"p{pct}"] = round(percentile(values, pct), 6)
+            entry["max"] = round(values[-1], 6) if values else 0.0
+            histograms[name] = entry
+        return {"counters": counters, "histograms": histograms}
+
+
+metrics = RunMetrics()
+
+
+def to_prometheus(summary: dict[str, Any], prefix: str = "pipeline") -> str:
+    def metric_name(name: str) -> str:
+        return f"{prefix}_{name}".replace(".", "_").replace("-", "_")
+
+    lines = []
+    for name, value in sorted(summary["counters"].items()):
+        lines.append(f"# TYPE {metric_name(name)} counter")
+        lines.append(f"{metric_name(name)} {value}")
+    for name, hist in sorted(summary["histograms"].items()):
+        base = metric_name(name)
+        lines.append(f"# TYPE {base} summary")
+        for pct in PERCENTILES:
+            lines.append(f'{base}{{quantile="{pct / 100}"}} {hist[f"p{pct}"]}')
+        lines.append(f"{base}_sum {hist['sum']}")
+        lines.append(f"{base}_count {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: Path, run: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".prom":
+        tmp.write_text(to_prometheus(run["metrics"]))
+    else:
+        tmp.write_text(json.dumps(run, indent=2))
+    tmp.replace(path)
+
+
+def record_run(started_at: str, finished_at: str, elapsed: float, summary: dict[str, Any]) -> int:
+    counters = summary["counters"]
+    with get_db() as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO pipeline_runs
+                (started_at, finished_at, elapsed_seconds, posts_fetched, posts_new, processed,
+                 errors, prompt_tokens, completion_tokens, metrics)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                started_at,
+                finished_at,
+                elapsed,
+                int(counters.get("posts.fetched", 0)),
+                int(counters.get("posts.new", 0)),
+                int(counters.get("posts.processed", 0)),
+                int(counters.get("posts.errors", 0)),
+                int(counters.get("llm.prompt_tokens", 0)),
+                int(counters.get("llm.completion_tokens", 0)),
+                json.dumps(summary),
+            ),
+        )
+        return cursor.lastrowid
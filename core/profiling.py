@@ -0,0 +1,126 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import ContextManager, Generator
+
+from core.config import config
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+PROFILE_MODES = ("cpu", "memory")
+_DISABLED = nullcontext()
+
+
+class StageProfiler:
+    def __init__(
+        self,
+        mode: str | None = None,
+        sample_rate: float | None = None,
+        output_dir: Path | None = None,
+        top: int = 30,
+    ) -> None:
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        rate = config.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._top = top
+        self._calls: dict[str, int] = {}
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._allocations: dict[str, dict[str, int]] = {}
+        self._peaks: dict[str, int] = {}
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.output_dir = output_dir or config.LOG_DIR / "profiles" / stamp
+
+        if self.mode == "memory" and not tracemalloc.is_tracing():
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None and self._every > 0
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _DISABLED
+        calls = self._calls.get(name, 0) + 1
+        self._calls[name] = calls
+        if (calls - 1) % self._every:
+            return _DISABLED
+        if self.mode == "cpu":
+            return self._cpu(name)
+        return self._memory(name)
+
+    @contextmanager
+    def _cpu(self, name: str) -> Generator[None, None, None]:
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    @contextmanager
+    def _memory(self, name: str) -> Generator[None, None, None]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            self._peaks[name] = max(self._peaks.get(name, 0), peak)
+            totals = self._allocations.setdefault(name, {})
+            for stat in after.compare_to(before, "lineno"):
+                if stat.size_diff > 0:
+                    key = str(stat.traceback[0])
+                    totals[key] = totals.get(key, 0) + stat.size_diff
+
+    def dump(self) -> Path | None:
+        if not self.enabled or not self._calls:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cpu":
+            for name, profile in self._profiles.items():
+                profile.dump_stats(str(self.output_dir / f"{name}.prof"))
+                report = io.StringIO()
+                pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(self._top)
+                (self.output_dir / f"{name}.txt").write_text(report.getvalue())
+        else:
+            for name, totals in self._allocations.items():
+                top = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:self._top]
+                lines = [
+                    f"stage: {name}",
+                    f"sampled calls: {len(range(0, self._calls[name], self._every))}/{self._calls[name]}",
+                    f"peak traced memory: {self._peaks.get(name, 0) / 1024:.1f} KiB",
+                    "",
+                ]
+                lines.extend(f"{size / 1024:10.1f} KiB  {location}" for location, size in top)
+                (self.output_dir / f"{name}.txt").write_text("\n".join(lines) + "\n")
+            tracemalloc.stop()
+        log.info("Wrote %s profiles to %s", self.mode, self.output_dir)
+        return self.output_dir
+
+
+class QueryTimer:
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.timings: list[tuple[str, float]] = []
+
+    def __call__(self, label: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _DISABLED
+        return self._time(label)
+
+    @contextmanager
+    def _time(self, label: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((label, time.perf_counter() - start))
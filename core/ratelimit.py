@@ -0,0 +1,205 @@
+import asyncio
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+from core.config import config
+from core.logger import get_logger
+from core.metrics import metrics
+
+log = get_logger(__name__)
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str | None) -> float | None:
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if value is None:
+        return None
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _header(headers: Mapping[str, str], name: str) -> str | None:
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.title())
+    return value
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.refill(now)
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def clamp(self, remaining: float, now: float) -> None:
+        self.refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        burst_seconds: float | None = None,
+    ) -> None:
+        burst = config.RATE_LIMIT_BURST_SECONDS if burst_seconds is None else burst_seconds
+        self.name = name
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute, burst) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute, burst) if tokens_per_minute > 0 else None
+        self._blocked_until = 0.0
+
+    def _reserve(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+        if wait > 0:
+            metrics.incr(f"ratelimit.{self.name}.throttled")
+            metrics.observe(f"ratelimit.{self.name}.wait", wait)
+        return wait
+
+    def acquire(self, tokens: float = 0) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 0) -> float:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, estimated: float, actual: float) -> None:
+        if self._tokens is None:
+            return
+        with self._lock:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.clamp(0, now)
+        log.warning("%s rate limited, pausing for %.1fs", self.name, seconds)
+
+    def update(self, headers: Mapping[str, str] | None, status: int | None = None) -> None:
+        if not headers and status != 429:
+            return
+        headers = headers or {}
+        retry_after = parse_retry_after(_header(headers, "retry-after"))
+        if status == 429 or retry_after is not None:
+            metrics.incr(f"ratelimit.{self.name}.rejected" if status == 429 else f"ratelimit.{self.name}.retry_after")
+            self.block_for(retry_after if retry_after is not None else config.RATE_LIMIT_DEFAULT_BACKOFF)
+            return
+
+        for bucket_attr, remaining_name, reset_name in (
+            ("_requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("_requests", "x-ratelimit-remaining", "x-ratelimit-reset"),
+            ("_tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ):
+            remaining_value = _header(headers, remaining_name)
+            if remaining_value is None:
+                continue
+            try:
+                remaining = float(remaining_value)
+            except ValueError:
+                continue
+            reset = parse_duration(_header(headers, reset_name))
+            with self._lock:
+                now = time.monotonic()
+                bucket = getattr(self, bucket_attr)
+                if bucket is not None:
+                    bucket.clamp(remaining, now)
+                if remaining < 1 and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+_share = 1.0
+
+
+def _budgets(name: str) -> tuple[float, float]:
+    budgets = {
+        "openai": (config.RATE_LIMIT_OPENAI_RPM, config.RATE_LIMIT_OPENAI_TPM),
+        "reddit": (config.RATE_LIMIT_REDDIT_RPM, 0),
+        "algolia": (config.RATE_LIMIT_ALGOLIA_RPM, 0),
+    }
+    return budgets.get(name, (0, 0))
+
+
+def get_limiter(
+    name: str,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+) -> RateLimiter:
+    if requests_per_minute is None and tokens_per_minute is None:
+        requests_per_minute, tokens_per_minute = _budgets(name)
+    requests_per_minute, tokens_per_minute = requests_per_minute or 0, tokens_per_minute or 0
+    key = f"{name}:{requests_per_minute}:{tokens_per_minute}"
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(name, requests_per_minute * _share, tokens_per_minute * _share)
+            _limiters[key] = limiter
+        return limiter
+
+
+def shared_cap(limit: int) -> int:
+    return max(1, int(limit * _share)) if limit > 0 else 0
+
+
+def set_budget_share(share: float) -> None:
+    global _share
+    with _limiters_lock:
+        _share = share
+        _limiters.clear()
+
+
+def response_headers(exc: Any) -> tuple[Mapping[str, str] | None, int | None]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None, None
+    return getattr(response, "headers", None), getattr(response, "status_code", None)
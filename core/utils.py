@@ -2,15 +2,20 @@ import sqlite3
 import struct
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Generator
-
-import numpy as np
+from typing import TYPE_CHECKING, Generator
 
 from core.config import config
 from core.logger import get_logger
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from core.writer import DBWriter
+
 log = get_logger(__name__)
 
+_writer: "DBWriter | None" = None
+
 config.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 SCHEMA_SQL = """
@@ -62,22 +67,87 @@ CREATE TABLE IF NOT EXISTS problem_clusters (
     PRIMARY KEY (problem_id, cluster_id)
 );
 
+CREATE TABLE IF NOT EXISTS post_state (
+    post_id TEXT PRIMARY KEY REFERENCES raw_posts(id),
+    stage TEXT NOT NULL,
+    problem_id INTEGER REFERENCES problems(id),
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TEXT,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS post_fingerprints (
+    post_id TEXT PRIMARY KEY REFERENCES raw_posts(id),
+    simhash INTEGER NOT NULL,
+    canonical_id TEXT REFERENCES raw_posts(id)
+);
+
+CREATE TABLE IF NOT EXISTS simhash_lsh (
+    bucket INTEGER NOT NULL,
+    post_id TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    PRIMARY KEY (bucket, post_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    posts_fetched INTEGER DEFAULT 0,
+    posts_new INTEGER DEFAULT 0,
+    processed INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    prompt_tokens INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    metrics TEXT
+);
+
 CREATE INDEX IF NOT EXISTS idx_problems_post_id ON problems(post_id);
-CREATE INDEX IF NOT EXISTS idx_problems_final_score ON problems(final_score DESC);
+DROP INDEX IF EXISTS idx_problems_final_score;
+CREATE INDEX IF NOT EXISTS idx_problems_score_id ON problems(final_score, id);
+CREATE INDEX IF NOT EXISTS idx_problems_momentum ON problems(momentum_score, final_score, id);
 CREATE INDEX IF NOT EXISTS idx_problems_created_at ON problems(created_at);
 CREATE INDEX IF NOT EXISTS idx_raw_posts_source ON raw_posts(source);
 CREATE INDEX IF NOT EXISTS idx_raw_posts_created_at ON raw_posts(created_at);
+CREATE INDEX IF NOT EXISTS idx_post_state_stage ON post_state(stage, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_post_fingerprints_canonical ON post_fingerprints(canonical_id);
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started_at ON pipeline_runs(started_at);
+"""
+
+SCHEMA_VERSION = 1
+
+BACKFILL_POST_STATE_SQL = """
+INSERT OR IGNORE INTO post_state (post_id, stage, attempts, updated_at)
+SELECT id, 'fetched', 0, ? FROM raw_posts
+WHERE id NOT IN (SELECT post_id FROM problems)
 """
 
 
 def init_db() -> None:
     with get_db() as conn:
         conn.executescript(SCHEMA_SQL)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            backfilled = conn.execute(BACKFILL_POST_STATE_SQL, (now_iso(),)).rowcount
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if backfilled:
+                log.info("Queued %d posts without a problem or pipeline state for processing", backfilled)
     log.info("Database initialized at %s", config.DB_PATH)
 
 
+def set_db_writer(writer: "DBWriter | None") -> None:
+    global _writer
+    _writer = writer
+
+
 @contextmanager
 def get_db() -> Generator[sqlite3.Connection, None, None]:
+    if _writer is not None:
+        with _writer.connection() as conn:
+            yield conn
+        return
+
     conn = sqlite3.connect(str(config.DB_PATH), timeout=30)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
@@ -92,12 +162,26 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
         conn.close()
 
 
-def vector_to_blob(vec: np.ndarray) -> bytes:
+@contextmanager
+def get_snapshot_db() -> Generator[sqlite3.Connection, None, None]:
+    conn = sqlite3.connect(f"{config.SNAPSHOT_PATH.resolve().as_uri()}?mode=ro&immutable=1", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def vector_to_blob(vec: "np.ndarray") -> bytes:
+    import numpy as np
+
     arr = vec.astype(np.float32)
     return struct.pack(f"{len(arr)}f", *arr)
 
 
-def blob_to_vector(blob: bytes) -> np.ndarray:
+def blob_to_vector(blob: bytes) -> "np.ndarray":
+    import numpy as np
+
     count = len(blob) // 4
     return np.array(struct.unpack(f"{count}f", blob), dtype=np.float32)
 
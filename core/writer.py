@@ -0,0 +1,265 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generator, Iterable
+
+from core.config import config
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+
+@dataclass
+class WriteOp:
+    sql: str
+    params: Any = ()
+    many: bool = False
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class BeginGroup:
+    pass
+
+
+@dataclass
+class EndGroup:
+    ok: bool = True
+
+
+@dataclass
+class Flush:
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class Stop:
+    pass
+
+
+@dataclass
+class OpResult:
+    lastrowid: int | None
+    rowcount: int
+    rows: list[sqlite3.Row]
+
+
+class PendingCursor:
+    def __init__(self, future: Future) -> None:
+        self._future = future
+
+    def _result(self) -> OpResult:
+        return self._future.result()
+
+    @property
+    def lastrowid(self) -> int | None:
+        return self._result().lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._result().rowcount
+
+    def fetchone(self) -> sqlite3.Row | None:
+        rows = self._result().rows
+        return rows[0] if rows else None
+
+    def fetchall(self) -> list[sqlite3.Row]:
+        return list(self._result().rows)
+
+    def __iter__(self):
+        return iter(self._result().rows)
+
+
+class WriterConnection:
+    def __init__(self, writer: "DBWriter") -> None:
+        self._writer = writer
+        self._futures: list[Future] = []
+
+    def execute(self, sql: str, params: Any = ()) -> PendingCursor:
+        return self._track(self._writer.submit(sql, params))
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Any]) -> PendingCursor:
+        return self._track(self._writer.submit(sql, list(seq_of_params), many=True))
+
+    def commit(self) -> None:
+        pass
+
+    def wait(self) -> None:
+        for future in self._futures:
+            future.result()
+
+    def _track(self, future: Future) -> PendingCursor:
+        self._futures.append(future)
+        return PendingCursor(future)
+
+
+class DBWriter:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        batch_size: int | None = None,
+        max_delay: float | None = None,
+    ) -> None:
+        self._db_path = db_path or config.DB_PATH
+        self._batch_size = batch_size or config.DB_WRITE_BATCH_SIZE
+        self._max_delay = config.DB_WRITE_BATCH_SECONDS if max_delay is None else max_delay
+        self._queue: queue.Queue = queue.Queue()
+        self._group_lock = threading.RLock()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._error: BaseException | None = None
+        self.commits = 0
+        self.ops = 0
+
+    def start(self) -> "DBWriter":
+        self._thread.start()
+        return self
+
+    def submit(self, sql: str, params: Any = (), many: bool = False) -> Future:
+        if self._error is not None:
+            raise RuntimeError("Database writer failed") from self._error
+        op = WriteOp(sql, params, many)
+        self._queue.put(op)
+        return op.future
+
+    @contextmanager
+    def connection(self) -> Generator[WriterConnection, None, None]:
+        with self._group_lock:
+            self._queue.put(BeginGroup())
+            conn = WriterConnection(self)
+            try:
+                yield conn
+                conn.wait()
+            except Exception:
+                self._queue.put(EndGroup(ok=False))
+                raise
+            self._queue.put(EndGroup(ok=True))
+
+    def flush(self, timeout: float | None = None) -> None:
+        marker = Flush()
+        with self._group_lock:
+            self._queue.put(marker)
+        if not marker.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for database writer flush")
+        if self._error is not None:
+            raise RuntimeError("Database writer failed") from self._error
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(Stop())
+            self._thread.join()
+        log.info("DB writer closed: %d ops in %d commits", self.ops, self.commits)
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(str(self._db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+
+        in_batch = False
+        batch_ops = 0
+        batch_started = 0.0
+        depth = 0
+
+        def commit() -> None:
+            nonlocal in_batch, batch_ops
+            if not in_batch:
+                return
+            try:
+                conn.execute("COMMIT")
+                self.commits += 1
+            except Exception as exc:
+                log.error("DB writer commit failed, batch of %d ops lost: %s", batch_ops, exc)
+                self._error = exc
+                conn.execute("ROLLBACK")
+            in_batch = False
+            batch_ops = 0
+
+        try:
+            while True:
+                timeout = None
+                if in_batch and depth == 0:
+                    timeout = max(0.0, batch_started + self._max_delay - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    commit()
+                    continue
+
+                if isinstance(item, WriteOp):
+                    if not in_batch:
+                        conn.execute("BEGIN")
+                        in_batch = True
+                        batch_started = time.monotonic()
+                    try:
+                        if item.many:
+                            cursor = conn.executemany(item.sql, item.params)
+                        else:
+                            cursor = conn.execute(item.sql, item.params)
+                        rows = cursor.fetchall() if cursor.description else []
+                        item.future.set_result(OpResult(cursor.lastrowid, cursor.rowcount, rows))
+                    except Exception as exc:
+                        item.future.set_exception(exc)
+                    batch_ops += 1
+                    self.ops += 1
+                elif isinstance(item, BeginGroup):
+                    if not in_batch:
+                        conn.execute("BEGIN")
+                        in_batch = True
+                        batch_started = time.monotonic()
+                    conn.execute(f"SAVEPOINT grp{depth}")
+                    depth += 1
+                elif isinstance(item, EndGroup):
+                    depth -= 1
+                    if not item.ok:
+                        conn.execute(f"ROLLBACK TO grp{depth}")
+                    conn.execute(f"RELEASE grp{depth}")
+                    if depth == 0 and (
+                        batch_ops >= self._batch_size
+                        or time.monotonic() - batch_started >= self._max_delay
+                    ):
+                        commit()
+                elif isinstance(item, Flush):
+                    if depth == 0:
+                        commit()
+                    item.done.set()
+                elif isinstance(item, Stop):
+                    commit()
+                    break
+        except Exception as exc:
+            log.error("DB writer stopped: %s", exc)
+            self._error = exc
+        finally:
+            conn.close()
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, WriteOp):
+                item.future.set_exception(RuntimeError("Database writer is not running"))
+            elif isinstance(item, Flush):
+                item.done.set()
+
+
+@contextmanager
+def batched_writes(enabled: bool = True) -> Generator[DBWriter | None, None, None]:
+    from core.utils import set_db_writer
+
+    if not enabled:
+        yield None
+        return
+    writer = DBWriter().start()
+    set_db_writer(writer)
+    try:
+        yield writer
+    finally:
+        set_db_writer(None)
+        writer.close()
@@ -0,0 +1,185 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from core.config import config
+from core.logger import get_logger
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+log = get_logger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    name: str = "base"
+
+    @abstractmethod
+    def encode(self, texts: list[str]) -> np.ndarray:
+        ...
+
+
+def load_sentence_transformer() -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
+    cache_dir = config.EMBEDDING_CACHE_DIR
+    if (cache_dir / "modules.json").exists():
+        log.info("Loading embedding model from local cache: %s", cache_dir)
+        return SentenceTransformer(str(cache_dir))
+
+    log.info("Loading embedding model: %s", config.EMBEDDING_MODEL)
+    model = SentenceTransformer(config.EMBEDDING_MODEL)
+    try:
+        model.save(str(cache_dir))
+        log.info("Cached embedding model at %s", cache_dir)
+    except Exception as exc:
+        log.warning("Could not cache embedding model: %s", exc)
+    return model
+
+
+class TorchBackend(EmbeddingBackend):
+    name = "torch"
+
+    def __init__(self, threads: int | None = None) -> None:
+        threads = config.EMBEDDING_THREADS if threads is None else threads
+        if threads > 0:
+            import torch
+
+            torch.set_num_threads(threads)
+        self._model = load_sentence_transformer()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        vecs = self._model.encode(
+            texts,
+            batch_size=config.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vecs, dtype=np.float32)
+
+
+def quantized_path(model_path: Path) -> Path:
+    return model_path.with_name(f"{model_path.stem}.int8{model_path.suffix}")
+
+
+def export_onnx(model_path: Path, quantize: bool = False) -> Path:
+    int8_path = quantized_path(model_path)
+    if quantize and int8_path.exists():
+        return int8_path
+
+    if not model_path.exists():
+        import torch
+
+        model = load_sentence_transformer()
+        transformer = model[0].auto_model.eval()
+
+        class _Encoder(torch.nn.Module):
+            def __init__(self, inner: torch.nn.Module) -> None:
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.inner(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    token_type_ids=token_type_ids,
+                )[0]
+
+        sample = model.tokenizer(["export sample"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask", "token_type_ids"]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        log.info("Exporting %s to ONNX: %s", config.EMBEDDING_MODEL, model_path)
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(transformer),
+                tuple(sample[name] for name in input_names),
+                str(model_path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+
+    if not quantize:
+        return model_path
+
+    if not int8_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        log.info("Quantizing ONNX model to int8: %s", int8_path)
+        quantize_dynamic(str(model_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxBackend(EmbeddingBackend):
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: Path | None = None,
+        quantize: bool | None = None,
+        threads: int | None = None,
+    ) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise RuntimeError("The onnx embedding backend requires `pip install onnxruntime`") from exc
+        from transformers import AutoTokenizer
+
+        model_path = model_path or config.EMBEDDING_ONNX_PATH
+        quantize = config.EMBEDDING_ONNX_QUANTIZE if quantize is None else quantize
+        threads = config.EMBEDDING_THREADS if threads is None else threads
+
+        path = export_onnx(model_path, quantize=quantize)
+        if not (config.EMBEDDING_CACHE_DIR / "tokenizer.json").exists():
+            load_sentence_transformer()
+        self._tokenizer = AutoTokenizer.from_pretrained(str(config.EMBEDDING_CACHE_DIR))
+
+        options = ort.SessionOptions()
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self._session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self.name = "onnx-int8" if quantize else "onnx"
+        log.info("ONNX embedding session ready: %s (threads=%s)", path, threads or "auto")
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), config.EMBEDDING_BATCH_SIZE):
+            batches.append(self._encode_batch(texts[start:start + config.EMBEDDING_BATCH_SIZE]))
+        if not batches:
+            return np.zeros((0, config.EMBEDDING_DIM), dtype=np.float32)
+        return np.vstack(batches)
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=config.EMBEDDING_MAX_SEQ_LENGTH,
+            return_tensors="np",
+        )
+        feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self._input_names}
+        token_embeddings = self._session.run(None, feeds)[0]
+
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def create_backend(name: str | None = None, threads: int | None = None) -> EmbeddingBackend:
+    name = (name or config.EMBEDDING_BACKEND).lower()
+    if name == "torch":
+        return TorchBackend(threads=threads)
+    if name == "onnx":
+        return OnnxBackend(threads=threads)
+    if name == "onnx-int8":
+        return OnnxBackend(quantize=True, threads=threads)
+    raise ValueError(f"Unknown embedding backend: {name}")
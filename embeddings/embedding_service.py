@@ -1,16 +1,56 @@
+import itertools
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Iterator
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from core.config import config
 from core.logger import get_logger
 from core.utils import get_db, vector_to_blob
+from embeddings.backends import EmbeddingBackend, create_backend
 
 log = get_logger(__name__)
 
+_worker_backend: EmbeddingBackend | None = None
+
+
+def _init_worker(backend_name: str, threads: int) -> None:
+    global _worker_backend
+    _worker_backend = create_backend(backend_name, threads=threads)
+
+
+def _encode_chunk(texts: list[str]) -> np.ndarray:
+    return _worker_backend.encode(texts)
+
+
+def embedding_text(problem_summary: str, target_group: str) -> str:
+    return f"{problem_summary} {target_group}".strip()
+
+
+def store_embedding(problem_id: int, vec: np.ndarray) -> None:
+    with get_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO embeddings (problem_id, vector) VALUES (?, ?)",
+            (problem_id, vector_to_blob(vec)),
+        )
+    log.debug("Stored embedding for problem %d", problem_id)
+
+
+def _chunked(items: Iterable[tuple[int, str]], size: int) -> Iterator[list[tuple[int, str]]]:
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
 
 class EmbeddingService:
     _instance: "EmbeddingService | None" = None
-    _model: SentenceTransformer | None = None
+    _backend: EmbeddingBackend | None = None
+    _pool: ProcessPoolExecutor | None = None
+    _pool_workers: int = 0
+    _lock = threading.Lock()
 
     def __new__(cls) -> "EmbeddingService":
         if cls._instance is None:
@@ -18,24 +58,85 @@ class EmbeddingService:
         return cls._instance
 
     def _load_model(self) -> None:
-        if self._model is None:
-            log.info("Loading embedding model: %s", config.EMBEDDING_MODEL)
-            self._model = SentenceTransformer(config.EMBEDDING_MODEL)
-            log.info("Embedding model loaded")
+        if self._backend is not None:
+            return
+        with self._lock:
+            if self._backend is None:
+                self._backend = create_backend(config.EMBEDDING_BACKEND)
+                log.info("Embedding backend loaded: %s", self._backend.name)
+
+    def warm_up(self) -> None:
+        try:
+            self._load_model()
+            self._backend.encode(["warm up"])
+        except Exception as exc:
+            log.warning("Embedding warm-up failed: %s", exc)
 
     def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
         self._load_model()
-        vec = self._model.encode(text, normalize_embeddings=True)
-        return vec.astype(np.float32)
+        return self._backend.encode(texts)
 
     def embed_and_store(self, problem_id: int, problem_summary: str, target_group: str) -> np.ndarray:
-        text = f"{problem_summary} {target_group}".strip()
-        vec = self.embed(text)
-        blob = vector_to_blob(vec)
+        vec = self.embed(embedding_text(problem_summary, target_group))
+        store_embedding(problem_id, vec)
+        return vec
+
+    def embed_corpus(
+        self,
+        items: Iterable[tuple[int, str]],
+        workers: int | None = None,
+        chunk_size: int | None = None,
+    ) -> int:
+        workers = workers or config.EMBEDDING_WORKERS
+        chunk_size = chunk_size or config.EMBEDDING_CORPUS_CHUNK
+        pool = self._get_pool(workers)
+
+        pending: deque[tuple[list[int], Future]] = deque()
+        stored = 0
+        for chunk in _chunked(items, chunk_size):
+            problem_ids = [problem_id for problem_id, _ in chunk]
+            texts = [text for _, text in chunk]
+            pending.append((problem_ids, pool.submit(_encode_chunk, texts)))
+            while len(pending) >= workers * 2:
+                stored += self._store_chunk(*pending.popleft())
+
+        while pending:
+            stored += self._store_chunk(*pending.popleft())
+        return stored
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+                self._pool_workers = 0
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is not None and self._pool_workers != workers:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            if self._pool is None:
+                log.info("Starting embedding pool: %d workers (%s)", workers, config.EMBEDDING_BACKEND)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(config.EMBEDDING_BACKEND, config.EMBEDDING_WORKER_THREADS),
+                )
+                self._pool_workers = workers
+            return self._pool
+
+    @staticmethod
+    def _store_chunk(problem_ids: list[int], future: Future) -> int:
+        vectors = future.result()
         with get_db() as conn:
-            conn.execute(
+            conn.executemany(
                 "INSERT OR REPLACE INTO embeddings (problem_id, vector) VALUES (?, ?)",
-                (problem_id, blob),
+                [(problem_id, vector_to_blob(vec)) for problem_id, vec in zip(problem_ids, vectors)],
             )
-        log.debug("Stored embedding for problem %d", problem_id)
-        return vec
+        log.debug("Stored %d embeddings", len(problem_ids))
+        return len(problem_ids)
@@ -0,0 +1,288 @@
+import gc
+import json
+import os
+import resource
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from analysis.clustering import ClusteringService
+from analysis.dedup import DuplicateDetector
+from analysis.llm_service import LLMService
+from analysis.problem_extractor import ProblemExtractor
+from analysis.scoring import ScoringService
+from core.config import config
+from core.logger import get_logger
+from core.metrics import RunMetrics, metrics, to_prometheus
+from core.profiling import StageProfiler
+from core.utils import init_db, now_iso
+from core.writer import batched_writes
+from embeddings.embedding_service import EmbeddingService
+from pipeline.run_pipeline import (
+    PipelineServices,
+    get_enabled_sources,
+    ingest_posts,
+    process_pending,
+    publish_run_metrics,
+    refresh_snapshot,
+    rescore_canonical_problems,
+)
+from pipeline.scheduler import AdaptiveScheduler
+from pipeline.sharding import ShardedPreparer
+from sources.base_source import BaseSource
+
+log = get_logger("daemon")
+
+EXIT_MEMORY_LIMIT = 75
+MAX_WAIT = 30.0
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PipelineDaemon:
+    def __init__(
+        self,
+        sources: list[BaseSource] | None = None,
+        llm: LLMService | None = None,
+        embedder: EmbeddingService | None = None,
+        profiler: StageProfiler | None = None,
+        workers: int = 1,
+        llm_factory: Callable[[], LLMService] = LLMService,
+        embedder_factory: Callable[[], EmbeddingService] = EmbeddingService,
+        scheduler: AdaptiveScheduler | None = None,
+    ) -> None:
+        self._sources = get_enabled_sources() if sources is None else sources
+        self._workers = workers
+        self._llm_factory = llm_factory
+        self._embedder_factory = embedder_factory
+        self._llm = llm
+        self._embedder = embedder
+        self._profiler = profiler or StageProfiler()
+        self.scheduler = scheduler or AdaptiveScheduler(self._sources)
+        self.totals = RunMetrics()
+        self._stop = threading.Event()
+        self._started = time.time()
+        self._heartbeat = time.time()
+        self._cycles = 0
+        self._last_cycle: dict[str, Any] | None = None
+        self._last_error: str | None = None
+        self._snapshot_stale = False
+        self._snapshot_at = 0.0
+        self._snapshot_published_at: str | None = None
+        self.exit_code = 0
+
+    def stop(self, *_: Any) -> None:
+        if not self._stop.is_set():
+            log.info("Shutdown requested, finishing the current post")
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self) -> int:
+        if not self._sources:
+            log.error("No sources available, aborting")
+            return 1
+
+        init_db()
+        llm = self._llm or self._llm_factory()
+        embedder = self._embedder or self._embedder_factory()
+        preparer = None
+        if self._workers > 1:
+            preparer = ShardedPreparer(self._workers, self._llm_factory, self._embedder_factory)
+        else:
+            embedder.warm_up()
+        services = PipelineServices(
+            ProblemExtractor(llm), embedder, ClusteringService(), ScoringService(), self._profiler,
+        )
+        detector = DuplicateDetector() if config.DEDUP_ENABLED else None
+        log.info("Daemon started with %d feeds", len(self.scheduler.feeds))
+
+        try:
+            with batched_writes(config.DB_WRITE_BATCH_SIZE > 1) as writer:
+                while not self.stopping:
+                    self._heartbeat = time.time()
+                    self._maybe_publish_snapshot()
+                    wait = self.scheduler.seconds_until_next(time.monotonic())
+                    if wait > 0:
+                        self._stop.wait(min(wait, MAX_WAIT))
+                        continue
+                    self._cycle(services, detector, preparer)
+                    if writer is not None:
+                        writer.flush()
+                    if self._over_memory_limit():
+                        self.exit_code = EXIT_MEMORY_LIMIT
+                        self.stop()
+            self._maybe_publish_snapshot(force=True)
+        finally:
+            if preparer is not None:
+                preparer.close()
+            self._profiler.dump()
+            log.info("Daemon stopped after %d cycles", self._cycles)
+        return self.exit_code
+
+    def _cycle(
+        self,
+        services: PipelineServices,
+        detector: DuplicateDetector | None,
+        preparer: ShardedPreparer | None,
+    ) -> None:
+        start = time.time()
+        started_at = now_iso()
+        new_count = 0
+        canonical_ids: set[str] = set()
+        polled = []
+
+        try:
+            for feed in self.scheduler.due(time.monotonic()):
+                if self.stopping:
+                    break
+                try:
+                    with metrics.timer(f"stage.fetch.{feed.source.name}"):
+                        posts = feed.source.fetch_feed(feed.name)
+                except Exception as exc:
+                    metrics.incr("sources.errors")
+                    log.error("Feed %s failed: %s", feed.key, exc)
+                    self.scheduler.record_error(feed, time.monotonic())
+                    continue
+                metrics.incr("posts.fetched", len(posts))
+                new_posts, canonical = ingest_posts(posts, detector, services.profiler)
+                new_count += len(new_posts)
+                canonical_ids |= canonical
+                self.scheduler.record(feed, len(new_posts), time.monotonic())
+                polled.append(feed.key)
+
+            processed, errors = process_pending(services, new_count, preparer, lambda: self.stopping)
+            rescore_canonical_problems(canonical_ids, services.scorer)
+            self._last_error = None
+        except Exception as exc:
+            processed = errors = 0
+            self._last_error = f"{type(exc).__name__}: {exc}"
+            log.exception("Daemon cycle failed")
+
+        elapsed = time.time() - start
+        if new_count or processed or errors:
+            publish_run_metrics(started_at, elapsed)
+            self._snapshot_stale = True
+        self.totals.merge(metrics.drain())
+        self._cycles += 1
+        self._last_cycle = {
+            "finished_at": now_iso(),
+            "elapsed_seconds": round(elapsed, 3),
+            "feeds": polled,
+            "new": new_count,
+            "processed": processed,
+            "errors": errors,
+        }
+        gc.collect()
+
+    def _maybe_publish_snapshot(self, force: bool = False) -> None:
+        if not self._snapshot_stale:
+            return
+        if not force and time.monotonic() - self._snapshot_at < config.SNAPSHOT_MIN_INTERVAL:
+            return
+        self._snapshot_at = time.monotonic()
+        if refresh_snapshot():
+            self._snapshot_stale = False
+            self._snapshot_published_at = now_iso()
+
+    def _over_memory_limit(self) -> bool:
+        if not config.DAEMON_MAX_RSS_MB:
+            return False
+        rss_mb = current_rss_bytes() / 1024 / 1024
+        if rss_mb <= config.DAEMON_MAX_RSS_MB:
+            return False
+        log.warning("RSS %.0f MB exceeds DAEMON_MAX_RSS_MB=%d, exiting for restart", rss_mb, config.DAEMON_MAX_RSS_MB)
+        return True
+
+    def health(self) -> tuple[int, dict[str, Any]]:
+        status = "stopping" if self.stopping else ("degraded" if self._last_error else "ok")
+        body = {
+            "status": status,
+            "uptime_seconds": round(time.time() - self._started, 1),
+            "heartbeat_age_seconds": round(time.time() - self._heartbeat, 1),
+            "cycles": self._cycles,
+            "rss_bytes": current_rss_bytes(),
+            "last_cycle": self._last_cycle,
+            "last_error": self._last_error,
+            "snapshot_published_at": self._snapshot_published_at,
+            "feeds": self.scheduler.snapshot(time.monotonic()),
+        }
+        return (200 if status == "ok" else 503), body
+
+    def prometheus(self) -> str:
+        lines = [
+            to_prometheus(self.totals.summary()).rstrip("\n"),
+            "# TYPE pipeline_daemon_uptime_seconds gauge",
+            f"pipeline_daemon_uptime_seconds {time.time() - self._started:.1f}",
+            "# TYPE pipeline_daemon_cycles counter",
+            f"pipeline_daemon_cycles {self._cycles}",
+            "# TYPE pipeline_daemon_rss_bytes gauge",
+            f"pipeline_daemon_rss_bytes {current_rss_bytes()}",
+            "# TYPE pipeline_feed_interval_seconds gauge",
+        ]
+        feeds = self.scheduler.snapshot(time.monotonic())
+        for feed in feeds:
+            lines.append(f'pipeline_feed_interval_seconds{{feed="{feed["feed"]}"}} {feed["interval_seconds"]}')
+        lines.append("# TYPE pipeline_feed_posts_per_hour gauge")
+        for feed in feeds:
+            if feed["posts_per_hour"] is not None:
+                lines.append(f'pipeline_feed_posts_per_hour{{feed="{feed["feed"]}"}} {feed["posts_per_hour"]}')
+        return "\n".join(line for line in lines if line) + "\n"
+
+
+def start_health_server(daemon: PipelineDaemon, host: str, port: int) -> ThreadingHTTPServer:
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/healthz":
+                code, body = daemon.health()
+                self._send(code, "application/json", json.dumps(body, indent=2))
+            elif self.path == "/metrics":
+                self._send(200, "text/plain; version=0.0.4", daemon.prometheus())
+            else:
+                self._send(404, "text/plain", "not found\n")
+
+        def _send(self, code: int, content_type: str, text: str) -> None:
+            payload = text.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            log.debug("health: " + fmt, *args)
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="daemon-health", daemon=True).start()
+    log.info("Health endpoint on http://%s:%d/healthz and /metrics", host, server.server_port)
+    return server
+
+
+def run_daemon(
+    workers: int = 1,
+    profiler: StageProfiler | None = None,
+    port: int | None = None,
+    **kwargs: Any,
+) -> int:
+    daemon = PipelineDaemon(profiler=profiler, workers=workers, **kwargs)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, daemon.stop)
+    server = start_health_server(
+        daemon, config.DAEMON_HEALTH_HOST, config.DAEMON_HEALTH_PORT if port is None else port,
+    )
+    try:
+        return daemon.run()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+from core.config import config
+from core.logger import get_logger
+from core.utils import get_db, now_iso
+from sources.base_source import RawPost
+
+log = get_logger(__name__)
+
+STAGES = ("fetched", "extracted", "embedded", "clustered", "scored")
+TERMINAL_STAGES = ("scored", "no_problem", "duplicate", "failed")
+
+
+def stage_index(stage: str) -> int:
+    return STAGES.index(stage)
+
+
+def mark_stage(post_id: str, stage: str, problem_id: int | None = None) -> None:
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT INTO post_state (post_id, stage, problem_id, attempts, updated_at)
+            VALUES (?, ?, ?, 0, ?)
+            ON CONFLICT(post_id) DO UPDATE SET
+                stage = excluded.stage,
+                problem_id = COALESCE(excluded.problem_id, post_state.problem_id),
+                last_error = NULL,
+                next_attempt_at = NULL,
+                updated_at = excluded.updated_at
+            """,
+            (post_id, stage, problem_id, now_iso()),
+        )
+
+
+def retry_delay(attempts: int) -> float:
+    return min(config.PIPELINE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), config.PIPELINE_RETRY_MAX_SECONDS)
+
+
+def mark_failed(post_id: str, error: str) -> int:
+    with get_db() as conn:
+        row = conn.execute("SELECT attempts FROM post_state WHERE post_id = ?", (post_id,)).fetchone()
+        attempts = (row["attempts"] if row else 0) + 1
+        now = datetime.now(timezone.utc)
+
+        if attempts >= config.PIPELINE_MAX_ATTEMPTS:
+            conn.execute(
+                """
+                UPDATE post_state
+                SET stage = 'failed', attempts = ?, last_error = ?, next_attempt_at = NULL, updated_at = ?
+                WHERE post_id = ?
+                """,
+                (attempts, error[:500], now.isoformat(), post_id),
+            )
+            log.warning("Post %s failed permanently after %d attempts: %s", post_id, attempts, error)
+        else:
+            next_attempt = now + timedelta(seconds=retry_delay(attempts))
+            conn.execute(
+                """
+                UPDATE post_state
+                SET attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ?
+                WHERE post_id = ?
+                """,
+                (attempts, error[:500], next_attempt.isoformat(), now.isoformat(), post_id),
+            )
+            log.info("Post %s attempt %d failed, retrying after %s", post_id, attempts, next_attempt.isoformat())
+    return attempts
+
+
+def pending_posts(limit: int | None = None) -> list[tuple[RawPost, str, int | None]]:
+    placeholders = ",".join("?" for _ in TERMINAL_STAGES)
+    query = f"""
+        SELECT rp.*, ps.stage, ps.problem_id
+        FROM post_state ps
+        JOIN raw_posts rp ON rp.id = ps.post_id
+        WHERE ps.stage NOT IN ({placeholders})
+          AND (ps.next_attempt_at IS NULL OR ps.next_attempt_at <= ?)
+        ORDER BY rp.created_at, rp.id
+    """
+    params: list = [*TERMINAL_STAGES, now_iso()]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    with get_db() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [
+        (
+            RawPost(
+                id=row["id"],
+                source=row["source"],
+                subreddit=row["subreddit"],
+                title=row["title"],
+                body=row["body"] or "",
+                upvotes=row["upvotes"],
+                comments=row["comments"],
+                created_at=row["created_at"],
+            ),
+            row["stage"],
+            row["problem_id"],
+        )
+        for row in rows
+    ]
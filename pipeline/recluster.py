@@ -0,0 +1,57 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analysis.clustering import ClusteringService
+from analysis.scoring import ScoringService
+from core.config import config
+from core.logger import get_logger
+from core.utils import get_db, init_db
+from core.writer import batched_writes
+from pipeline.retention import load_all_embeddings
+
+log = get_logger("recluster")
+
+
+def recluster(include_archived: bool = False, threshold: float | None = None) -> int:
+    start = time.time()
+    init_db()
+    ids, vectors = load_all_embeddings(include_archived=include_archived)
+    with get_db() as conn:
+        problem_ids = [row["id"] for row in conn.execute("SELECT id FROM problems ORDER BY id")]
+        conn.execute("DELETE FROM problem_clusters")
+        conn.execute("DELETE FROM clusters")
+
+    clusterer = ClusteringService(threshold)
+    scorer = ScoringService()
+    with batched_writes(config.DB_WRITE_BATCH_SIZE > 1):
+        for problem_id, vector in zip(ids.tolist(), vectors):
+            clusterer.assign_cluster(problem_id, vector)
+        for problem_id in problem_ids:
+            scorer.score_problem(problem_id)
+
+    with get_db() as conn:
+        clusters = conn.execute("SELECT COUNT(*) FROM clusters").fetchone()[0]
+    missing = len(problem_ids) - len(ids)
+    if missing > 0:
+        log.warning("%d problems have no embedding and were left unclustered", missing)
+    log.info(
+        "Reclustered %d problems into %d clusters (%s) in %.1fs",
+        len(ids), clusters, "hot + archived" if include_archived else "hot only", time.time() - start,
+    )
+    return clusters
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild problem clusters from stored embeddings and rescore")
+    parser.add_argument("--include-archived", action="store_true", help="Also cluster embeddings moved to the archive")
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+    recluster(include_archived=args.include_archived, threshold=args.threshold)
+
+
+if __name__ == "__main__":
+    main()
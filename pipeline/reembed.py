@@ -0,0 +1,60 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import config
+from core.logger import get_logger
+from core.utils import get_db, init_db
+from embeddings.embedding_service import EmbeddingService, embedding_text
+from pipeline.retention import archived_embedding_ids
+
+log = get_logger("reembed")
+
+
+def iter_problem_texts(only_missing: bool = False) -> Iterator[tuple[int, str]]:
+    query = "SELECT p.id, p.problem_summary, p.target_group FROM problems p"
+    if only_missing:
+        query += " LEFT JOIN embeddings e ON e.problem_id = p.id WHERE e.problem_id IS NULL"
+    query += " ORDER BY p.id"
+    archived = archived_embedding_ids() if only_missing else set()
+    with get_db() as conn:
+        for row in conn.execute(query):
+            if row["id"] not in archived:
+                yield row["id"], embedding_text(row["problem_summary"], row["target_group"] or "")
+
+
+def reembed(workers: int, chunk_size: int, only_missing: bool = False) -> int:
+    start = time.time()
+    init_db()
+    embedder = EmbeddingService()
+    try:
+        stored = embedder.embed_corpus(
+            iter_problem_texts(only_missing=only_missing),
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+    finally:
+        embedder.close()
+    elapsed = time.time() - start
+    log.info(
+        "Re-embedded %d problems with %d workers in %.1fs (%.1f texts/s)",
+        stored, workers, elapsed, stored / elapsed if elapsed else 0.0,
+    )
+    return stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-embed the problems table")
+    parser.add_argument("--workers", type=int, default=config.EMBEDDING_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=config.EMBEDDING_CORPUS_CHUNK)
+    parser.add_argument("--only-missing", action="store_true")
+    args = parser.parse_args()
+    reembed(args.workers, args.chunk_size, only_missing=args.only_missing)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import gzip
+import json
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from core.config import config
+from core.logger import get_logger
+from core.utils import blob_to_vector, get_db, init_db
+from pipeline.post_state import TERMINAL_STAGES
+
+log = get_logger("retention")
+
+POST_COLUMNS = ("id", "source", "subreddit", "title", "body", "upvotes", "comments", "created_at", "fetched_at")
+BATCH_SIZE = 5000
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _partition_dir(kind: str, day: str) -> Path:
+    return config.ARCHIVE_DIR / kind / f"date={day}"
+
+
+def _part_name() -> str:
+    return f"part-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}"
+
+
+def _write_posts(day: str, rows: list[dict]) -> Path:
+    directory = _partition_dir("raw_posts", day)
+    directory.mkdir(parents=True, exist_ok=True)
+    if _has_pyarrow():
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = directory / f"{_part_name()}.parquet"
+        table = pa.Table.from_pylist(rows)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(table, str(tmp), compression="zstd")
+    else:
+        path = directory / f"{_part_name()}.jsonl.gz"
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(row) + "\n")
+    tmp.replace(path)
+    return path
+
+
+def _write_embeddings(day: str, problem_ids: list[int], vectors: list[np.ndarray]) -> Path:
+    directory = _partition_dir("embeddings", day)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{_part_name()}.npz"
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp, problem_ids=np.array(problem_ids, dtype=np.int64), vectors=np.vstack(vectors))
+    tmp.replace(path)
+    return path
+
+
+def _settled_condition(post_column: str) -> str:
+    terminal = ",".join(f"'{stage}'" for stage in TERMINAL_STAGES)
+    return f"""NOT EXISTS (
+        SELECT 1 FROM post_state ps WHERE ps.post_id = {post_column} AND ps.stage NOT IN ({terminal})
+    )"""
+
+
+def archive_posts(cutoff: str) -> int:
+    archived = 0
+    while True:
+        with get_db() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join(POST_COLUMNS)} FROM raw_posts rp
+                WHERE rp.created_at < ? AND rp.body IS NOT NULL AND {_settled_condition("rp.id")}
+                ORDER BY rp.created_at
+                LIMIT ?
+                """,
+                (cutoff, BATCH_SIZE),
+            ).fetchall()
+        if not rows:
+            return archived
+
+        by_day: dict[str, list[dict]] = defaultdict(list)
+        for row in rows:
+            by_day[row["created_at"][:10]].append(dict(row))
+        for day, day_rows in by_day.items():
+            path = _write_posts(day, day_rows)
+            log.debug("Archived %d posts to %s", len(day_rows), path)
+
+        with get_db() as conn:
+            conn.executemany("UPDATE raw_posts SET body = NULL WHERE id = ?", [(row["id"],) for row in rows])
+        archived += len(rows)
+        log.info("Archived %d posts so far", archived)
+
+
+def archive_embeddings(cutoff: str) -> int:
+    archived = 0
+    while True:
+        with get_db() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT e.problem_id, e.vector, p.created_at FROM embeddings e
+                JOIN problems p ON p.id = e.problem_id
+                WHERE p.created_at < ? AND {_settled_condition("p.post_id")}
+                ORDER BY e.problem_id
+                LIMIT ?
+                """,
+                (cutoff, BATCH_SIZE),
+            ).fetchall()
+        if not rows:
+            return archived
+
+        by_day: dict[str, tuple[list[int], list[np.ndarray]]] = defaultdict(lambda: ([], []))
+        for row in rows:
+            ids, vectors = by_day[row["created_at"][:10]]
+            ids.append(row["problem_id"])
+            vectors.append(blob_to_vector(row["vector"]))
+        for day, (ids, vectors) in by_day.items():
+            path = _write_embeddings(day, ids, vectors)
+            log.debug("Archived %d embeddings to %s", len(ids), path)
+
+        with get_db() as conn:
+            conn.executemany("DELETE FROM embeddings WHERE problem_id = ?", [(row["problem_id"],) for row in rows])
+        archived += len(rows)
+        log.info("Archived %d embeddings so far", archived)
+
+
+def compact(pages: int) -> int:
+    with get_db() as conn:
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        log.info("Enabling incremental auto_vacuum (one-time full VACUUM)")
+        with get_db() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.commit()
+            conn.execute("VACUUM")
+        return 0
+
+    with get_db() as conn:
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})" if pages else "PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    reclaimed = min(free, pages) if pages else free
+    log.info("Reclaimed %d free pages", reclaimed)
+    return reclaimed
+
+
+def run_retention(days: int | None = None, vacuum_pages: int | None = None) -> dict[str, int]:
+    days = config.RETENTION_DAYS if days is None else days
+    vacuum_pages = config.RETENTION_VACUUM_PAGES if vacuum_pages is None else vacuum_pages
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    init_db()
+    log.info("Archiving data older than %s (%d days) to %s", cutoff, days, config.ARCHIVE_DIR)
+    posts = archive_posts(cutoff)
+    embeddings = archive_embeddings(cutoff)
+    reclaimed = compact(vacuum_pages)
+    log.info("Retention complete: %d posts, %d embeddings archived", posts, embeddings)
+    return {"posts": posts, "embeddings": embeddings, "pages_reclaimed": reclaimed}
+
+
+def _partitions(kind: str, start: str | None, end: str | None) -> list[Path]:
+    root = config.ARCHIVE_DIR / kind
+    if not root.exists():
+        return []
+    selected = []
+    for directory in sorted(root.glob("date=*")):
+        day = directory.name.split("=", 1)[1]
+        if (start is None or day >= start) and (end is None or day < end):
+            selected.append(directory)
+    return selected
+
+
+def _read_post_part(path: Path) -> Iterator[dict]:
+    if path.name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        yield from pq.read_table(str(path)).to_pylist()
+    elif path.name.endswith(".jsonl.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                yield json.loads(line)
+
+
+def iter_archived_posts(start: str | None = None, end: str | None = None) -> Iterator[dict]:
+    for directory in _partitions("raw_posts", start, end):
+        seen: set[str] = set()
+        for path in sorted(directory.iterdir()):
+            for row in _read_post_part(path):
+                if row["id"] not in seen:
+                    seen.add(row["id"])
+                    yield row
+
+
+def load_archived_embeddings(start: str | None = None, end: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+    ids: list[np.ndarray] = []
+    vectors: list[np.ndarray] = []
+    for directory in _partitions("embeddings", start, end):
+        for path in sorted(directory.glob("*.npz")):
+            with np.load(path) as data:
+                ids.append(data["problem_ids"])
+                vectors.append(data["vectors"])
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, config.EMBEDDING_DIM), dtype=np.float32)
+    all_ids = np.concatenate(ids)
+    _, first = np.unique(all_ids, return_index=True)
+    return all_ids[first], np.vstack(vectors)[first]
+
+
+def archived_embedding_ids() -> set[int]:
+    ids: set[int] = set()
+    for directory in _partitions("embeddings", None, None):
+        for path in directory.glob("*.npz"):
+            with np.load(path) as data:
+                ids.update(data["problem_ids"].tolist())
+    return ids
+
+
+def load_all_embeddings(include_archived: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    archived_ids, archived_vectors = (
+        load_archived_embeddings() if include_archived
+        else (np.zeros(0, dtype=np.int64), np.zeros((0, config.EMBEDDING_DIM), dtype=np.float32))
+    )
+    with get_db() as conn:
+        rows = conn.execute("SELECT problem_id, vector FROM embeddings ORDER BY problem_id").fetchall()
+    hot_ids = np.array([row["problem_id"] for row in rows], dtype=np.int64)
+    hot_vectors = (
+        np.vstack([blob_to_vector(row["vector"]) for row in rows])
+        if rows else np.zeros((0, config.EMBEDDING_DIM), dtype=np.float32)
+    )
+    ids = np.concatenate([archived_ids, hot_ids])
+    vectors = np.vstack([archived_vectors, hot_vectors])
+    order = np.argsort(ids, kind="stable")
+    ids, vectors = ids[order], vectors[order]
+    keep = np.append(ids[1:] != ids[:-1], True)
+    return ids[keep], vectors[keep]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive cold posts and embeddings, then compact the database")
+    parser.add_argument("--days", type=int, default=config.RETENTION_DAYS)
+    parser.add_argument("--vacuum-pages", type=int, default=config.RETENTION_VACUUM_PAGES)
+    args = parser.parse_args()
+    run_retention(args.days, args.vacuum_pages)
+
+
+if __name__ == "__main__":
+    main()
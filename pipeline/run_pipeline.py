@@ -1,16 +1,31 @@
+import argparse
+import sqlite3
 import sys
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import numpy as np
+
 from analysis.clustering import ClusteringService
+from analysis.dedup import DuplicateDetector, release_canonical
 from analysis.llm_service import LLMService
-from analysis.problem_extractor import ProblemExtractor
+from analysis.problem_extractor import ExtractionError, ProblemExtractor
 from analysis.scoring import ScoringService
+from core.config import config
 from core.logger import get_logger
-from core.utils import get_db, init_db, now_iso, post_exists
-from embeddings.embedding_service import EmbeddingService
+from core.metrics import metrics, record_run, write_metrics_file
+from core.profiling import PROFILE_MODES, StageProfiler
+from core.utils import blob_to_vector, get_db, init_db, now_iso, post_exists
+from core.writer import batched_writes
+from embeddings.embedding_service import EmbeddingService, store_embedding
+from pipeline.post_state import mark_failed, mark_stage, pending_posts, stage_index
+from pipeline.sharding import PreparedPost, ShardedPreparer
+from pipeline.snapshot import publish_snapshot
 from sources.askhn_source import AskHNSource
 from sources.base_source import BaseSource, RawPost
 from sources.reddit_source import RedditSource
@@ -48,76 +63,360 @@ def store_raw_post(post: RawPost) -> None:
         )
 
 
-def run_pipeline() -> None:
-    start = time.time()
-    log.info("=" * 60)
-    log.info("Pipeline started")
+@dataclass
+class PipelineServices:
+    extractor: ProblemExtractor
+    embedder: EmbeddingService
+    clusterer: ClusteringService
+    scorer: ScoringService
+    profiler: StageProfiler
 
-    init_db()
 
-    sources = get_enabled_sources()
-    if not sources:
-        log.error("No sources available, aborting")
-        return
+def existing_problem_id(post_id: str) -> int | None:
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT id FROM problems WHERE post_id = ? ORDER BY id LIMIT 1", (post_id,)
+        ).fetchone()
+    return row["id"] if row else None
 
-    llm = LLMService()
-    extractor = ProblemExtractor(llm)
-    embedder = EmbeddingService()
-    clusterer = ClusteringService()
-    scorer = ScoringService()
 
+def load_embedding(problem_id: int) -> np.ndarray | None:
+    with get_db() as conn:
+        row = conn.execute("SELECT vector FROM embeddings WHERE problem_id = ?", (problem_id,)).fetchone()
+    return blob_to_vector(row["vector"]) if row else None
+
+
+def is_clustered(problem_id: int) -> bool:
+    with get_db() as conn:
+        row = conn.execute("SELECT 1 FROM problem_clusters WHERE problem_id = ?", (problem_id,)).fetchone()
+    return row is not None
+
+
+def process_post(
+    post: RawPost,
+    stage: str,
+    problem_id: int | None,
+    services: PipelineServices,
+    prepared: PreparedPost | None = None,
+) -> bool:
+    done = stage_index(stage)
+    profiler = services.profiler
+    if done > 0:
+        metrics.incr(f"posts.resumed_from.{stage}")
+
+    embedding = None
+    if done < stage_index("extracted"):
+        problem_id = existing_problem_id(post.id)
+        if problem_id is None and prepared is not None:
+            if prepared.error:
+                raise ExtractionError(prepared.error)
+            if prepared.result:
+                problem_id = services.extractor.store(post.id, prepared.result)
+                if prepared.vector is not None:
+                    embedding = prepared.vector
+        elif problem_id is None:
+            with metrics.timer("stage.extract"), profiler.stage("extract"):
+                problem_id = services.extractor.extract_and_store(post)
+        if not problem_id:
+            metrics.incr("posts.no_problem")
+            mark_stage(post.id, "no_problem")
+            return False
+        mark_stage(post.id, "extracted", problem_id)
+
+    if embedding is not None:
+        store_embedding(problem_id, embedding)
+        mark_stage(post.id, "embedded", problem_id)
+    elif done >= stage_index("embedded"):
+        embedding = load_embedding(problem_id)
+    if embedding is None:
+        with get_db() as conn:
+            problem = conn.execute(
+                "SELECT problem_summary, target_group FROM problems WHERE id = ?",
+                (problem_id,),
+            ).fetchone()
+
+        with metrics.timer("stage.embed"), profiler.stage("embed"):
+            embedding = services.embedder.embed_and_store(
+                problem_id,
+                problem["problem_summary"],
+                problem["target_group"] or "",
+            )
+        mark_stage(post.id, "embedded", problem_id)
+
+    if done < stage_index("clustered"):
+        if not is_clustered(problem_id):
+            with metrics.timer("stage.cluster"), profiler.stage("cluster"):
+                services.clusterer.assign_cluster(problem_id, embedding)
+        mark_stage(post.id, "clustered", problem_id)
+
+    with metrics.timer("stage.score"), profiler.stage("score"):
+        services.scorer.score_problem(problem_id)
+    mark_stage(post.id, "scored", problem_id)
+    return True
+
+
+def fetch_all(sources: list[BaseSource], profiler: StageProfiler) -> list[RawPost]:
     all_posts: list[RawPost] = []
     for source in sources:
         try:
-            posts = source.fetch()
+            with metrics.timer(f"stage.fetch.{source.name}"), profiler.stage(f"fetch_{source.name}"):
+                posts = source.fetch()
             all_posts.extend(posts)
         except Exception as exc:
+            metrics.incr("sources.errors")
             log.error("Source %s failed: %s", source.name, exc)
 
+    metrics.incr("posts.fetched", len(all_posts))
     log.info("Total posts fetched: %d", len(all_posts))
+    return all_posts
 
-    new_posts = [p for p in all_posts if not post_exists(p.id)]
+
+def ingest_posts(
+    posts: list[RawPost],
+    detector: DuplicateDetector | None,
+    profiler: StageProfiler,
+) -> tuple[list[RawPost], set[str]]:
+    new_posts = [p for p in posts if not post_exists(p.id)]
+    metrics.incr("posts.new", len(new_posts))
+    metrics.incr("posts.known", len(posts) - len(new_posts))
     log.info("New posts to process: %d", len(new_posts))
 
+    canonical_ids: set[str] = set()
+    with metrics.timer("stage.store"), profiler.stage("store"):
+        for post in new_posts:
+            store_raw_post(post)
+            canonical_id = None
+            if detector is not None:
+                with metrics.timer("stage.dedup"):
+                    canonical_id = detector.check_and_index(post)
+            if canonical_id:
+                metrics.incr("posts.duplicates")
+                canonical_ids.add(canonical_id)
+                mark_stage(post.id, "duplicate")
+            else:
+                mark_stage(post.id, "fetched")
+    if canonical_ids:
+        log.info("Linked near-duplicate posts to %d canonical posts", len(canonical_ids))
+    return new_posts, canonical_ids
+
+
+def process_pending(
+    services: PipelineServices,
+    new_count: int,
+    preparer: ShardedPreparer | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> tuple[int, int]:
+    work = pending_posts()
+    resumed = max(0, len(work) - new_count)
+    metrics.incr("posts.resumed", resumed)
+    log.info("Posts to process (including %d resumed): %d", resumed, len(work))
+
     processed = 0
     errors = 0
+    prepared_posts: Iterator[PreparedPost] = iter(())
+    dispatched: set[str] = set()
+    if preparer is not None:
+        to_prepare = [
+            post for post, stage, _ in work
+            if stage == "fetched" and existing_problem_id(post.id) is None
+        ]
+        dispatched = {post.id for post in to_prepare}
+        prepared_posts = preparer.prepare(to_prepare)
+        log.info("Dispatched %d posts to %d workers", len(to_prepare), preparer.workers)
 
-    for post in new_posts:
+    for post, stage, problem_id in work:
+        if should_stop is not None and should_stop():
+            log.info("Stop requested, leaving %d posts for the next run", len(work) - processed - errors)
+            break
+        prepared = next(prepared_posts) if post.id in dispatched else None
         try:
-            store_raw_post(post)
+            if process_post(post, stage, problem_id, services, prepared):
+                processed += 1
+                metrics.incr("posts.processed")
+                if processed % 10 == 0:
+                    log.info("Processed %d/%d posts", processed, len(work))
+        except Exception as exc:
+            errors += 1
+            metrics.incr("posts.errors")
+            log.error("Error processing post %s: %s", post.id, exc)
+            if mark_failed(post.id, str(exc)) >= config.PIPELINE_MAX_ATTEMPTS:
+                metrics.incr("posts.failed")
+                promote_duplicate(post.id)
+    return processed, errors
 
-            problem_id = extractor.extract_and_store(post)
-            if not problem_id:
-                continue
 
-            with get_db() as conn:
-                problem = conn.execute(
-                    "SELECT problem_summary, target_group FROM problems WHERE id = ?",
-                    (problem_id,),
-                ).fetchone()
+def promote_duplicate(post_id: str) -> None:
+    if release_canonical(post_id):
+        metrics.incr("posts.duplicates_promoted")
 
-            embedding = embedder.embed_and_store(
-                problem_id,
-                problem["problem_summary"],
-                problem["target_group"] or "",
-            )
 
-            clusterer.assign_cluster(problem_id, embedding)
+def rescore_canonical_problems(canonical_ids: set[str], scorer: ScoringService) -> None:
+    for post_id in sorted(canonical_ids):
+        problem_id = existing_problem_id(post_id)
+        if problem_id is not None:
+            with metrics.timer("stage.score"):
+                scorer.score_problem(problem_id)
 
-            scorer.score_problem(problem_id)
 
-            processed += 1
-            if processed % 10 == 0:
-                log.info("Processed %d/%d posts", processed, len(new_posts))
+def run_pipeline(
+    sources: list[BaseSource] | None = None,
+    llm: LLMService | None = None,
+    embedder: EmbeddingService | None = None,
+    profiler: StageProfiler | None = None,
+    workers: int = 1,
+    llm_factory: Callable[[], LLMService] = LLMService,
+    embedder_factory: Callable[[], EmbeddingService] = EmbeddingService,
+) -> dict[str, float]:
+    init_db()
+    with batched_writes(config.DB_WRITE_BATCH_SIZE > 1):
+        result = _run_pipeline(sources, llm, embedder, profiler, workers, llm_factory, embedder_factory)
+    refresh_snapshot()
+    return result
 
-        except Exception as exc:
-            errors += 1
-            log.error("Error processing post %s: %s", post.id, exc)
 
-    elapsed = time.time() - start
+def _run_pipeline(
+    sources: list[BaseSource] | None,
+    llm: LLMService | None,
+    embedder: EmbeddingService | None,
+    profiler: StageProfiler | None,
+    workers: int,
+    llm_factory: Callable[[], LLMService],
+    embedder_factory: Callable[[], EmbeddingService],
+) -> dict[str, float]:
+    start = time.time()
+    started_at = now_iso()
+    log.info("=" * 60)
+    log.info("Pipeline started")
+    metrics.reset()
+    profiler = profiler or StageProfiler()
+
+    processed = errors = 0
+    try:
+        processed, errors = _run_stages(sources, llm, embedder, profiler, workers, llm_factory, embedder_factory)
+    finally:
+        elapsed = time.time() - start
+        publish_run_metrics(started_at, elapsed)
+        profiler.dump()
     log.info("Pipeline complete: %d processed, %d errors, %.1fs elapsed", processed, errors, elapsed)
     log.info("=" * 60)
+    return {"processed": processed, "errors": errors, "elapsed": elapsed}
+
+
+def _run_stages(
+    sources: list[BaseSource] | None,
+    llm: LLMService | None,
+    embedder: EmbeddingService | None,
+    profiler: StageProfiler,
+    workers: int,
+    llm_factory: Callable[[], LLMService],
+    embedder_factory: Callable[[], EmbeddingService],
+) -> tuple[int, int]:
+    sources = get_enabled_sources() if sources is None else sources
+    if not sources:
+        log.error("No sources available, aborting")
+        metrics.incr("sources.errors")
+        return 0, 0
+
+    llm = llm or llm_factory()
+    extractor = ProblemExtractor(llm)
+    embedder = embedder or embedder_factory()
+    clusterer = ClusteringService()
+    scorer = ScoringService()
+
+    preparer = None
+    if workers > 1:
+        preparer = ShardedPreparer(workers, llm_factory, embedder_factory)
+    else:
+        warm_up = threading.Thread(target=embedder.warm_up, name="embedding-warm-up", daemon=True)
+        warm_up.start()
+
+    all_posts = fetch_all(sources, profiler)
+    detector = DuplicateDetector() if config.DEDUP_ENABLED else None
+    new_posts, canonical_ids = ingest_posts(all_posts, detector, profiler)
+
+    services = PipelineServices(extractor, embedder, clusterer, scorer, profiler)
+    try:
+        processed, errors = process_pending(services, len(new_posts), preparer)
+    finally:
+        if preparer is not None:
+            preparer.close()
+
+    rescore_canonical_problems(canonical_ids, scorer)
+    return processed, errors
+
+
+def publish_run_metrics(started_at: str, elapsed: float) -> None:
+    summary = metrics.summary()
+    for name, hist in sorted(summary["histograms"].items()):
+        if name.startswith("stage.") or name.startswith("llm."):
+            log.info(
+                "  %-24s n=%-5d p50=%.3fs p95=%.3fs p99=%.3fs",
+                name, hist["count"], hist["p50"], hist["p95"], hist["p99"],
+            )
+    counters = summary["counters"]
+    raw_tokens = counters.get("prompt.body_tokens_raw", 0)
+    if raw_tokens:
+        kept_tokens = counters.get("prompt.body_tokens", 0)
+        log.info(
+            "  Input tokens: %d sent to the LLM, body %d -> %d after preparation (%.0f%% saved)",
+            counters.get("llm.prompt_tokens", 0), raw_tokens, kept_tokens, 100 * (1 - kept_tokens / raw_tokens),
+        )
+    tiers = sorted({name.split(".")[2] for name in counters if name.startswith("llm.tier.")})
+    for tier in tiers:
+        prefix = f"llm.tier.{tier}"
+        accepted = counters.get(f"{prefix}.accepted", 0)
+        escalated = counters.get(f"{prefix}.escalations", 0)
+        log.info(
+            "  LLM tier %-12s requests=%d accepted=%d escalated=%d (%.0f%%) cost=$%.4f",
+            tier, counters.get(f"{prefix}.requests", 0), accepted, escalated,
+            100 * escalated / (accepted + escalated) if accepted + escalated else 0.0,
+            counters.get(f"{prefix}.cost_usd", 0.0),
+        )
+    try:
+        run_id = record_run(started_at, now_iso(), elapsed, summary)
+        if config.METRICS_FILE:
+            write_metrics_file(
+                Path(config.METRICS_FILE),
+                {"run_id": run_id, "started_at": started_at, "elapsed_seconds": elapsed, "metrics": summary},
+            )
+    except Exception as exc:
+        log.error("Failed to record run metrics: %s", exc)
+
+
+def refresh_snapshot() -> bool:
+    if not config.SNAPSHOT_ENABLED:
+        return False
+    try:
+        publish_snapshot()
+    except (sqlite3.Error, OSError) as exc:
+        log.error("Failed to publish dashboard snapshot: %s", exc)
+        return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ingestion pipeline")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None)
+    parser.add_argument("--profile-sample-rate", type=float, default=config.PROFILE_SAMPLE_RATE)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--daemon", action="store_true", help="Keep running and poll sources on an adaptive schedule")
+    parser.add_argument("--health-port", type=int, default=config.DAEMON_HEALTH_PORT)
+    args = parser.parse_args()
+
+    if args.daemon:
+        from pipeline.daemon import run_daemon
+
+        sys.exit(run_daemon(
+            workers=args.workers,
+            profiler=StageProfiler(args.profile, sample_rate=args.profile_sample_rate),
+            port=args.health_port,
+        ))
+
+    run_pipeline(
+        profiler=StageProfiler(args.profile, sample_rate=args.profile_sample_rate),
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    main()
@@ -0,0 +1,96 @@
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from core.config import config
+from core.logger import get_logger
+from sources.base_source import BaseSource
+
+log = get_logger(__name__)
+
+JITTER = 0.1
+
+
+@dataclass
+class Feed:
+    source: BaseSource
+    name: str
+    interval: float
+    next_due: float = 0.0
+    rate: float | None = None
+    last_polled: float | None = None
+    polls: int = 0
+    errors: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.source.name if self.name == self.source.name else f"{self.source.name}/{self.name}"
+
+
+class AdaptiveScheduler:
+    def __init__(
+        self,
+        sources: list[BaseSource],
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        target_new_posts: float | None = None,
+        smoothing: float | None = None,
+    ) -> None:
+        self._min = config.DAEMON_MIN_INTERVAL if min_interval is None else min_interval
+        self._max = config.DAEMON_MAX_INTERVAL if max_interval is None else max_interval
+        self._target = config.DAEMON_TARGET_NEW_POSTS if target_new_posts is None else target_new_posts
+        self._smoothing = config.DAEMON_RATE_SMOOTHING if smoothing is None else smoothing
+        self._lock = threading.Lock()
+        self.feeds = [Feed(source, name, self._min) for source in sources for name in source.feeds()]
+
+    def due(self, now: float) -> list[Feed]:
+        with self._lock:
+            return sorted((f for f in self.feeds if f.next_due <= now), key=lambda f: f.next_due)
+
+    def seconds_until_next(self, now: float) -> float:
+        with self._lock:
+            if not self.feeds:
+                return self._max
+            return max(0.0, min(f.next_due for f in self.feeds) - now)
+
+    def record(self, feed: Feed, new_posts: int, now: float) -> None:
+        with self._lock:
+            if feed.last_polled is not None:
+                observed = new_posts / max(now - feed.last_polled, 1e-6)
+                feed.rate = observed if feed.rate is None else (
+                    self._smoothing * observed + (1 - self._smoothing) * feed.rate
+                )
+                feed.interval = self._clamp(self._target / feed.rate if feed.rate > 0 else self._max)
+            feed.last_polled = now
+            feed.polls += 1
+            self._schedule(feed, now)
+        log.debug("%s: %d new, next poll in %.0fs", feed.key, new_posts, feed.interval)
+
+    def record_error(self, feed: Feed, now: float) -> None:
+        with self._lock:
+            feed.errors += 1
+            feed.interval = self._clamp(feed.interval * 2)
+            self._schedule(feed, now)
+        log.warning("%s: poll failed, backing off to %.0fs", feed.key, feed.interval)
+
+    def snapshot(self, now: float) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "feed": f.key,
+                    "interval_seconds": round(f.interval, 1),
+                    "posts_per_hour": round(f.rate * 3600, 2) if f.rate is not None else None,
+                    "next_poll_in_seconds": round(max(0.0, f.next_due - now), 1),
+                    "polls": f.polls,
+                    "errors": f.errors,
+                }
+                for f in self.feeds
+            ]
+
+    def _clamp(self, interval: float) -> float:
+        return min(self._max, max(self._min, interval))
+
+    @staticmethod
+    def _schedule(feed: Feed, now: float) -> None:
+        feed.next_due = now + feed.interval * random.uniform(1 - JITTER, 1 + JITTER)
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+import numpy as np
+
+from analysis.problem_extractor import ProblemExtractor
+from core.config import config
+from core.logger import get_logger
+from core.metrics import metrics
+from core.ratelimit import set_budget_share
+from embeddings.embedding_service import embedding_text
+from sources.base_source import RawPost
+
+log = get_logger(__name__)
+
+_extractor: ProblemExtractor | None = None
+_embedder: Any = None
+
+
+@dataclass
+class PreparedPost:
+    post_id: str
+    result: dict[str, Any] | None = None
+    vector: np.ndarray | None = None
+    error: str | None = None
+    metrics: dict[str, Any] = field(default_factory=dict)
+
+
+def shard_for(post_id: str, shards: int) -> int:
+    return zlib.crc32(post_id.encode("utf-8")) % shards
+
+
+def embedding_threads_per_shard(shards: int) -> int:
+    total = config.EMBEDDING_THREADS or os.cpu_count() or 1
+    return max(1, total // shards)
+
+
+def _init_worker(
+    llm_factory: Callable[[], Any],
+    embedder_factory: Callable[[], Any],
+    shards: int,
+    embedding_threads: int,
+) -> None:
+    global _extractor, _embedder
+    set_budget_share(1 / shards)
+    config.EMBEDDING_THREADS = embedding_threads
+    _extractor = ProblemExtractor(llm_factory())
+    _embedder = embedder_factory()
+
+
+def _prepare(post: RawPost) -> PreparedPost:
+    prepared = PreparedPost(post.id)
+    try:
+        with metrics.timer("stage.extract"):
+            prepared.result = _extractor.extract(post)
+        if prepared.result:
+            text = embedding_text(prepared.result["problem_summary"], prepared.result["target_group"] or "")
+            with metrics.timer("stage.embed"):
+                prepared.vector = _embedder.embed(text)
+    except Exception as exc:
+        prepared.error = f"{type(exc).__name__}: {exc}"
+    prepared.metrics = metrics.drain()
+    return prepared
+
+
+class ShardedPreparer:
+    def __init__(
+        self,
+        workers: int,
+        llm_factory: Callable[[], Any],
+        embedder_factory: Callable[[], Any],
+        window: int | None = None,
+    ) -> None:
+        context = multiprocessing.get_context("spawn")
+        threads = embedding_threads_per_shard(workers)
+        self._shards = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(llm_factory, embedder_factory, workers, threads),
+            )
+            for _ in range(workers)
+        ]
+        self.workers = workers
+        self._window = window or workers * 4
+        log.info("Started %d pipeline worker processes with %d embedding threads each", workers, threads)
+
+    def prepare(self, posts: Iterable[RawPost]) -> Iterator[PreparedPost]:
+        pending: deque[tuple[str, Future]] = deque()
+        for post in posts:
+            shard = self._shards[shard_for(post.id, len(self._shards))]
+            pending.append((post.id, shard.submit(_prepare, post)))
+            if len(pending) >= self._window:
+                yield self._collect(*pending.popleft())
+        while pending:
+            yield self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(post_id: str, future: Future) -> PreparedPost:
+        try:
+            prepared = future.result()
+        except Exception as exc:
+            return PreparedPost(post_id, error=f"worker failed: {exc}")
+        metrics.merge(prepared.metrics)
+        return prepared
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.shutdown(wait=True, cancel_futures=True)
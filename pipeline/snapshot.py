@@ -0,0 +1,164 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import config
+from core.logger import get_logger
+from core.metrics import metrics
+from core.utils import get_snapshot_db, now_iso
+
+log = get_logger("snapshot")
+
+KEEP_TABLES = {"dashboard_problems", "dashboard_facets", "dashboard_totals", "pipeline_runs"}
+
+PROBLEMS_SELECT = """
+SELECT
+    p.id,
+    p.problem_summary,
+    p.target_group,
+    p.market_type,
+    p.buyer_type,
+    p.pain_score,
+    p.monetization_score,
+    p.complexity_score,
+    p.engagement_score,
+    p.frequency_score,
+    p.momentum_score,
+    p.final_score,
+    p.created_at,
+    rp.source,
+    rp.subreddit,
+    rp.title AS post_title,
+    rp.upvotes,
+    rp.comments,
+    rp.id AS post_id,
+    COALESCE((
+        SELECT MAX(cl.size) FROM problem_clusters pc JOIN clusters cl ON cl.id = pc.cluster_id
+        WHERE pc.problem_id = p.id
+    ), 1) AS cluster_size
+FROM problems p
+JOIN raw_posts rp ON rp.id = p.post_id
+"""
+
+FACETS_SELECT = """
+SELECT DISTINCT 'market_type' AS kind, market_type AS value FROM problems WHERE market_type IS NOT NULL
+UNION SELECT DISTINCT 'source', source FROM raw_posts
+UNION SELECT DISTINCT 'subreddit', subreddit FROM raw_posts WHERE subreddit IS NOT NULL
+"""
+
+TOTALS_COLUMNS = """
+(SELECT COUNT(*) FROM raw_posts) AS posts,
+(SELECT COUNT(*) FROM problems) AS problems,
+(SELECT COUNT(*) FROM clusters) AS clusters
+"""
+
+DASHBOARD_SQL = f"""
+CREATE TABLE dashboard_problems AS {PROBLEMS_SELECT};
+
+CREATE TABLE dashboard_facets (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, value)
+) WITHOUT ROWID;
+
+INSERT INTO dashboard_facets {FACETS_SELECT};
+
+CREATE TABLE dashboard_totals (
+    posts INTEGER NOT NULL,
+    problems INTEGER NOT NULL,
+    clusters INTEGER NOT NULL,
+    published_at TEXT NOT NULL
+);
+
+CREATE INDEX idx_dashboard_score ON dashboard_problems(final_score, id);
+CREATE INDEX idx_dashboard_momentum ON dashboard_problems(momentum_score, final_score, id);
+CREATE INDEX idx_dashboard_created_at ON dashboard_problems(created_at);
+"""
+
+LIVE_VIEWS_SQL = f"""
+CREATE TEMP VIEW dashboard_problems AS {PROBLEMS_SELECT};
+CREATE TEMP VIEW dashboard_facets AS {FACETS_SELECT};
+CREATE TEMP VIEW dashboard_totals AS
+SELECT {TOTALS_COLUMNS}, COALESCE((SELECT MAX(finished_at) FROM pipeline_runs), '') AS published_at;
+"""
+
+
+def _build_dashboard_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(DASHBOARD_SQL)
+    conn.execute(f"INSERT INTO dashboard_totals SELECT {TOTALS_COLUMNS}, ?", (now_iso(),))
+    tables = [
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    ]
+    for table in tables:
+        if table not in KEEP_TABLES:
+            conn.execute(f"DROP TABLE {table}")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def snapshot_available() -> bool:
+    return config.SNAPSHOT_ENABLED and config.SNAPSHOT_PATH.exists()
+
+
+@contextmanager
+def get_dashboard_db() -> Generator[sqlite3.Connection, None, None]:
+    if snapshot_available():
+        with get_snapshot_db() as conn:
+            yield conn
+        return
+
+    conn = sqlite3.connect(f"{config.DB_PATH.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(LIVE_VIEWS_SQL)
+        yield conn
+    finally:
+        conn.close()
+
+
+def publish_snapshot(path: Path | None = None) -> Path:
+    path = path or config.SNAPSHOT_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.unlink(missing_ok=True)
+
+    start = time.perf_counter()
+    source = sqlite3.connect(str(config.DB_PATH), timeout=30)
+    target = sqlite3.connect(str(tmp))
+    try:
+        source.backup(target)
+        target.execute("PRAGMA journal_mode=DELETE")
+        _build_dashboard_tables(target)
+        target.execute("PRAGMA auto_vacuum=NONE")
+        target.execute("VACUUM")
+    except BaseException:
+        target.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(tmp, path)
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("stage.snapshot", elapsed)
+    log.info("Published dashboard snapshot %s (%.1f MB) in %.2fs", path, path.stat().st_size / 1024 / 1024, elapsed)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish the read-only dashboard snapshot from the pipeline database")
+    parser.add_argument("--output", type=Path, default=config.SNAPSHOT_PATH)
+    args = parser.parse_args()
+    publish_snapshot(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,29 @@
 from datetime import datetime, timezone
 
-import requests
-
 from core.config import config
 from core.logger import get_logger
+from core.ratelimit import get_limiter
 from sources.base_source import BaseSource, RawPost
 
 log = get_logger(__name__)
 
+MAX_THROTTLED = 5
+
 
 class AskHNSource(BaseSource):
     name = "askhn"
 
     def fetch(self) -> list[RawPost]:
+        import requests
+
+        limiter = get_limiter("algolia")
         posts: list[RawPost] = []
         try:
             page = 0
             collected = 0
+            throttled = 0
             while collected < config.ASKHN_FETCH_LIMIT:
+                limiter.acquire()
                 resp = requests.get(
                     config.ASKHN_API_URL,
                     params={
@@ -27,6 +33,10 @@ class AskHNSource(BaseSource):
                     },
                     timeout=30,
                 )
+                limiter.update(resp.headers, resp.status_code)
+                if resp.status_code == 429 and throttled < MAX_THROTTLED:
+                    throttled += 1
+                    continue
                 resp.raise_for_status()
                 data = resp.json()
                 hits = data.get("hits", [])
@@ -20,3 +20,9 @@ class BaseSource(ABC):
     @abstractmethod
     def fetch(self) -> list[RawPost]:
         ...
+
+    def feeds(self) -> list[str]:
+        return [self.name]
+
+    def fetch_feed(self, feed: str) -> list[RawPost]:
+        return self.fetch()
@@ -1,22 +1,38 @@
 from datetime import datetime, timezone
 
-import praw
-
 from core.config import config
 from core.logger import get_logger
+from core.ratelimit import get_limiter
 from sources.base_source import BaseSource, RawPost
 
 log = get_logger(__name__)
 
 
+def _limited_requestor_class() -> type:
+    from prawcore import Requestor
+
+    class LimitedRequestor(Requestor):
+        def request(self, *args, **kwargs):
+            limiter = get_limiter("reddit")
+            limiter.acquire()
+            response = super().request(*args, **kwargs)
+            limiter.update(response.headers, response.status_code)
+            return response
+
+    return LimitedRequestor
+
+
 class RedditSource(BaseSource):
     name = "reddit"
 
     def __init__(self) -> None:
+        import praw
+
         self._reddit = praw.Reddit(
             client_id=config.REDDIT_CLIENT_ID,
             client_secret=config.REDDIT_SECRET,
             user_agent=config.REDDIT_USER_AGENT,
+            requestor_class=_limited_requestor_class(),
         )
 
     def fetch(self) -> list[RawPost]:
@@ -29,6 +45,12 @@ class RedditSource(BaseSource):
         log.info("Reddit: fetched %d posts total", len(posts))
         return posts
 
+    def feeds(self) -> list[str]:
+        return list(config.REDDIT_SUBREDDITS)
+
+    def fetch_feed(self, feed: str) -> list[RawPost]:
+        return self._fetch_subreddit(feed)
+
     def _fetch_subreddit(self, sub_name: str) -> list[RawPost]:
         subreddit = self._reddit.subreddit(sub_name)
         results: list[RawPost] = []